@@ -0,0 +1,38 @@
+from decimal import Decimal
+from argparse import ArgumentParser
+from core import run_simulation
+from test import generate_configs
+
+def flatten(output: dict, prefix: str = '') -> iter:
+    for key, val in output.items():
+        if type(val) is dict:
+            yield from flatten(val, f'{prefix}{key}.')
+        else:
+            yield f'{prefix}{key}', val if type(val) is list else [val]
+
+def measure_errors(engine: str) -> (dict, dict):
+    relative_errors = {}
+    absolute_errors = {}
+    for config in generate_configs():
+        expected = dict(flatten(run_simulation(config)))
+        actual = dict(flatten(run_simulation({**config, 'engine': engine})))
+        for key in expected:
+            for x, y in zip(expected[key], actual[key]):
+                x, y = Decimal(x), Decimal(y)
+                if x != 0:
+                    relative_errors[key] = max(relative_errors.get(key, 0), abs((y - x) / x))
+                else:
+                    absolute_errors[key] = max(absolute_errors.get(key, 0), abs(y))
+    return relative_errors, absolute_errors
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('engine', nargs='?', choices=['float', 'fixed'], default='float')
+    args = parser.parse_args()
+    relative_errors, absolute_errors = measure_errors(args.engine)
+    print('maximum relative error where the decimal engine is non-zero:')
+    for key, val in relative_errors.items():
+        print(f'- {key}: {val:.3e}')
+    print('maximum absolute error where the decimal engine is zero:')
+    for key, val in absolute_errors.items():
+        print(f'- {key}: {val:.3e}')
@@ -0,0 +1,478 @@
+from sys import executable, version
+from json import loads, dumps
+from time import perf_counter
+from os import path, makedirs
+from tempfile import TemporaryDirectory
+from subprocess import run, Popen, PIPE
+from threading import Thread
+from random import Random
+from math import exp
+from platform import platform
+from argparse import ArgumentParser
+from decimal import setcontext
+
+here = path.dirname(path.abspath(__file__))
+run_py = path.join(here, 'run.py')
+
+def load_config(config_file_name: str) -> dict:
+    fileDesc = open(config_file_name, 'r')
+    config = loads(fileDesc.read())
+    fileDesc.close()
+    config.pop('logging', None)
+    return config
+
+def bench_spawn(config: dict, count: int) -> list:
+    outputs = []
+    for n in range(count):
+        with TemporaryDirectory(prefix='simulation_') as folder:
+            input_file_name = path.join(folder, 'input.json')
+            output_file_name = path.join(folder, 'output.json')
+            fileDesc = open(input_file_name, 'w')
+            fileDesc.write(dumps(config, indent=2))
+            fileDesc.close()
+            run([executable, run_py, '-c', input_file_name, '-o', output_file_name], check=True)
+            fileDesc = open(output_file_name, 'r')
+            outputs.append(loads(fileDesc.read()))
+            fileDesc.close()
+    return outputs
+
+def bench_serve(config: dict, count: int) -> list:
+    worker = Popen([executable, run_py, '--serve'], stdin=PIPE, stdout=PIPE, text=True)
+
+    def submit():
+        for n in range(count):
+            worker.stdin.write(dumps({'id': n, 'config': config}) + '\n')
+        worker.stdin.flush()
+
+    # pipeline every request before reading any reply, as concurrent api calls would
+    submitter = Thread(target=submit)
+    submitter.start()
+    try:
+        replies = {}
+        for n in range(count):
+            reply = loads(worker.stdout.readline())
+            replies[reply['id']] = reply['output']
+        return [replies[n] for n in range(count)]
+    finally:
+        submitter.join()
+        worker.stdin.close()
+        worker.wait()
+
+def measure(function: callable, *args) -> (float, any):
+    start = perf_counter()
+    result = function(*args)
+    return perf_counter() - start, result
+
+def range_bound_config(length: int) -> dict:
+    # a strategy quoting around 100, with prices which leave its spread once in every 50 steps on average
+    rng = Random(0)
+    prices = [100 + rng.uniform(-0.5, 0.5) if rng.random() > 0.02 else rng.choice([97, 103]) + rng.uniform(-1, 1) for n in range(length)]
+    return {
+        'portfolio_cash_value': '1000',
+        'portfolio_risk_value': '10',
+        'low_range_low_price': '95',
+        'low_range_high_price': '99',
+        'low_range_start_price': '99',
+        'high_range_low_price': '101',
+        'high_range_high_price': '105',
+        'high_range_start_price': '101',
+        'network_fee': '0.002',
+        'prices': [f'{price:.4f}' for price in prices]
+    }
+
+def worker(args):
+    config = load_config(args.config_file_name)
+
+    spawn_time, spawn_outputs = measure(bench_spawn, config, args.count)
+    serve_time, serve_outputs = measure(bench_serve, config, args.count)
+
+    assert spawn_outputs == serve_outputs, 'the worker output differs from the spawned process output'
+
+    print(f'requests: {args.count}')
+    print(f'spawn per request: {spawn_time:.3f}s total, {spawn_time / args.count * 1000:.1f}ms per request')
+    print(f'persistent worker: {serve_time:.3f}s total, {serve_time / args.count * 1000:.1f}ms per request')
+    print(f'speedup: {spawn_time / serve_time:.1f}x')
+
+def events(args):
+    from core import execute, execute_events, strToDec, create_context
+
+    setcontext(create_context())
+
+    config = strToDec(range_bound_config(args.length))
+
+    step_time, step_output = measure(execute, config, {})
+    event_time, event_output = measure(execute_events, config)
+
+    assert step_output == event_output, 'the event-driven output differs from the step-by-step output'
+
+    trades = sum(1 for x, y in zip(step_output['CASH']['balance'], step_output['CASH']['balance'][1:]) if x != y)
+    print(f'steps: {args.length}, trades: {trades}')
+    print(f'step by step: {step_time:.3f}s total, {step_time / args.length * 1e6:.1f}us per step')
+    print(f'event driven: {event_time:.3f}s total, {event_time / args.length * 1e6:.1f}us per step')
+    print(f'speedup: {step_time / event_time:.1f}x')
+
+def columnar(args):
+    from numpy import array
+    from core import simulate, decToStr, create_context
+    from core.columnar import encode, decode, COLUMNS
+
+    setcontext(create_context())
+
+    config = load_config(args.config_file_name)
+    config['prices'] = config['prices'] * args.repeat
+    recorder = simulate(config)
+
+    def encode_json():
+        return dumps(decToStr(recorder), indent=4)
+
+    def decode_json(text):
+        output = loads(text)
+        return [array([float(val) for val in (output[path[0]][path[1]] if len(path) == 2 else output[path[0]])]) for path in COLUMNS]
+
+    def decode_columnar(buffer):
+        output = decode(buffer)
+        return [output[path[0]][path[1]] if len(path) == 2 else output[path[0]] for path in COLUMNS]
+
+    json_encode_time, text = measure(encode_json)
+    json_decode_time, _ = measure(decode_json, text)
+    print(f'steps: {len(config["prices"])}')
+    print(f'json: {len(text.encode())} bytes, encode {json_encode_time * 1000:.1f}ms, decode {json_decode_time * 1000:.1f}ms')
+    for dtype in ['f8', 'i8']:
+        encode_time, buffer = measure(encode, recorder, dtype)
+        decode_time, _ = measure(decode_columnar, buffer)
+        print(f'{dtype}: {len(buffer)} bytes, encode {encode_time * 1000:.1f}ms, decode {decode_time * 1000:.1f}ms')
+
+def startup(args):
+    config = load_config(args.config_file_name)
+    config['prices'] = config['prices'][:args.length]
+    logging = {
+        'output_file_name': None,
+        'cash_token_symbol': 'CASH',
+        'risk_token_symbol': 'RISK',
+        'dates': [f'2022-01-01T{n // 60 % 24:02d}:{n % 60:02d}:00' for n in range(args.length)]
+    }
+    probe = 'import sys, json, core; core.run_simulation(json.loads(sys.argv[1])); print(sorted(set(sys.modules) & {"pandas", "tabulate", "numpy"}))'
+
+    import_time, _ = measure(lambda: [run([executable, '-c', 'import core'], cwd=here, check=True) for n in range(args.count)])
+    print(f'import core: {import_time / args.count * 1000:.1f}ms')
+
+    with TemporaryDirectory(prefix='simulation_') as folder:
+        logging['output_file_name'] = path.join(folder, 'output.log')
+        for name, case in [('without logging', config), ('with logging', {**config, 'logging': logging})]:
+            imported = run([executable, '-c', probe, dumps(case)], cwd=here, check=True, capture_output=True, text=True).stdout.strip()
+            input_file_name = path.join(folder, 'input.json')
+            fileDesc = open(input_file_name, 'w')
+            fileDesc.write(dumps(case))
+            fileDesc.close()
+            run_time, _ = measure(lambda: [run([executable, run_py, '-c', input_file_name, '-o', path.join(folder, 'output.json')], check=True) for n in range(args.count)])
+            print(f'{name}: heavy modules imported {imported}')
+            print(f'- run.py cold start: {run_time / args.count * 1000:.1f}ms')
+
+def logger(args):
+    from core import execute, strToDec, create_context
+    from core.real_logger import RealLogger
+
+    setcontext(create_context())
+
+    config = load_config(args.config_file_name)
+    config['prices'] = (config['prices'] * (args.length // len(config['prices']) + 1))[:args.length]
+    config_carbon = strToDec(config)
+
+    with TemporaryDirectory(prefix='simulation_') as folder:
+        config_logger = {
+            'output_file_name': path.join(folder, 'output.log'),
+            'cash_token_symbol': 'CASH',
+            'risk_token_symbol': 'RISK',
+            'dates': [f'2022-01-01T{n // 60 % 24:02d}:{n % 60:02d}:00' for n in range(args.length)]
+        }
+        fake_time, fake_output = measure(execute, config_carbon, {})
+        real_time, real_output = measure(execute, config_carbon, config_logger)
+        assert fake_output == real_output, 'the output with logging differs from the output without logging'
+
+        # the summary table of every step, rendered via the precomputed layout and via tabulate
+        real_logger = RealLogger(config_logger)
+        values = [['1.000000000000000000'] * 7 + [f'+{n % 1000}.00000000000000000%'] for n in range(args.length)]
+        layout_time, layout_summaries = measure(lambda: [real_logger._summarize(val) for val in values])
+        real_logger.widths = None
+        tabulate_time, tabulate_summaries = measure(lambda: [real_logger._summarize(val) for val in values])
+        real_logger.close()
+        assert layout_summaries == tabulate_summaries, 'the precomputed layout differs from tabulate'
+
+    print(f'steps: {args.length}')
+    print(f'without logging: {fake_time:.3f}s total, {fake_time / args.length * 1e6:.1f}us per step')
+    print(f'with logging: {real_time:.3f}s total, {real_time / args.length * 1e6:.1f}us per step')
+    print(f'logging overhead: {(real_time - fake_time) / args.length * 1e6:.1f}us per step')
+    print(f'summary table via layout: {layout_time / args.length * 1e6:.1f}us per step')
+    print(f'summary table via tabulate: {tabulate_time / args.length * 1e6:.1f}us per step')
+
+SHAPES = {
+    'two_sided': {
+        'portfolio_cash_value': '1000',
+        'portfolio_risk_value': '1000',
+        'low_range_low_price': '90',
+        'low_range_high_price': '99',
+        'low_range_start_price': '99',
+        'high_range_low_price': '101',
+        'high_range_high_price': '110',
+        'high_range_start_price': '101',
+        'network_fee': '0.002'
+    }
+}
+SHAPES['cash_only'] = {**SHAPES['two_sided'], 'portfolio_risk_value': '0'}
+SHAPES['risk_only'] = {**SHAPES['two_sided'], 'portfolio_cash_value': '0'}
+SHAPES['concentrated'] = {**SHAPES['two_sided'], 'low_range_low_price': '99', 'high_range_high_price': '101'}
+SHAPES['no_fee'] = {**SHAPES['two_sided'], 'network_fee': '0'}
+
+def mean_reverting_prices(length: int) -> list:
+    # a log-price which reverts to 100 and stays mostly within 7% of it, so every shape keeps trading over any length
+    rng = Random(0)
+    prices = []
+    x = 0
+    for n in range(length):
+        x = 0.999 * x + rng.gauss(0, 0.003)
+        prices.append(f'{100 * exp(x):.4f}')
+    return prices
+
+def measure_best(budget: float, repeat: int, function: callable, *args) -> (float, any):
+    # the best of several runs, as long as they fit into the time budget
+    best, result = measure(function, *args)
+    total = best
+    for n in range(repeat - 1):
+        if total + best > budget:
+            break
+        elapsed, result = measure(function, *args)
+        total += elapsed
+        best = min(best, elapsed)
+    return best, result
+
+def suite(args):
+    from core import create_carbon, execute, strToDec, decToStr, create_context
+
+    setcontext(create_context())
+
+    results = {}
+
+    def record(name: str, shape: str, length: int, function: callable, *args_) -> any:
+        elapsed, result = measure_best(args.budget, args.repeat, function, *args_)
+        results[f'{name}/{shape}/{length}'] = elapsed
+        print(f'{name}/{shape}/{length}: {elapsed * 1000:.3f}ms, {elapsed / length * 1e6:.2f}us per step', flush=True)
+        return result
+
+    with TemporaryDirectory(prefix='simulation_') as folder:
+        for length in args.lengths:
+            prices = mean_reverting_prices(length)
+            for shape in args.shapes:
+                config = {**SHAPES[shape], 'prices': prices}
+                config_carbon = record('strToDec', shape, length, strToDec, config)
+                record('create_carbon', shape, length, create_carbon, config_carbon)
+                recorder = record('execute', shape, length, execute, config_carbon, {})
+                record('decToStr', shape, length, decToStr, recorder)
+                if length <= args.max_logging_length:
+                    config_logger = {
+                        'output_file_name': path.join(folder, 'output.log'),
+                        'cash_token_symbol': 'CASH',
+                        'risk_token_symbol': 'RISK',
+                        'dates': [f'2022-01-01T{n // 60 % 24:02d}:{n % 60:02d}:00' for n in range(length)]
+                    }
+                    record('execute_logging', shape, length, execute, config_carbon, config_logger)
+                input_file_name = path.join(folder, 'input.json')
+                fileDesc = open(input_file_name, 'w')
+                fileDesc.write(dumps(config))
+                fileDesc.close()
+                record('run.py', shape, length, run, [executable, run_py, '-c', input_file_name, '-o', path.join(folder, 'output.json')])
+
+    report = {'python': version, 'platform': platform(), 'results': results}
+    if args.output_file_name:
+        fileDesc = open(args.output_file_name, 'w')
+        fileDesc.write(dumps(report, indent=4))
+        fileDesc.close()
+    if args.baseline:
+        exit(report_regressions(load_report(args.baseline), report, args.threshold))
+
+def load_report(file_name: str) -> dict:
+    fileDesc = open(file_name, 'r')
+    report = loads(fileDesc.read())
+    fileDesc.close()
+    return report
+
+def report_regressions(baseline: dict, current: dict, threshold: float) -> int:
+    regressions = 0
+    for key in sorted(baseline['results'].keys() & current['results'].keys()):
+        ratio = current['results'][key] / baseline['results'][key]
+        regressed = ratio > 1 + threshold
+        regressions += regressed
+        print(f'{key}: {ratio:.2f}x{" REGRESSION" if regressed else ""}')
+    print(f'regressions: {regressions}')
+    return 1 if regressions else 0
+
+def compare(args):
+    exit(report_regressions(load_report(args.baseline), load_report(args.current), args.threshold))
+
+# both versions run in a fresh process of their own, with the same configuration
+PROBE = (
+    'import sys, json, time, decimal; import core; config = core.strToDec(json.loads(sys.stdin.read())); '
+    'decimal.setcontext(decimal.Context(prec=100, rounding=decimal.ROUND_HALF_DOWN)); '
+    'start = time.perf_counter(); core.execute(config, {}) if sys.argv[1] == "execute" else core.execute_events(config); print(time.perf_counter() - start)'
+)
+
+def extract_core(revision: str, folder: str):
+    toplevel, prefix = run(['git', 'rev-parse', '--show-toplevel', '--show-prefix'], cwd=here, check=True, capture_output=True, text=True).stdout.split('\n')[:2]
+    archive = run(['git', 'archive', f'{revision}:{prefix}core'], cwd=toplevel, check=True, capture_output=True).stdout
+    makedirs(path.join(folder, 'core'))
+    run(['tar', '-x', '-C', path.join(folder, 'core')], input=archive, check=True)
+
+def measure_probe(cwd: str, function_name: str, config: str, repeat: int) -> float:
+    return min(float(run([executable, '-c', PROBE, function_name], cwd=cwd, input=config, check=True, capture_output=True, text=True).stdout) for n in range(repeat))
+
+def revision(args):
+    prices = mean_reverting_prices(args.length)
+    with TemporaryDirectory(prefix='simulation_') as folder:
+        extract_core(args.revision, folder)
+        print(f'steps: {args.length}')
+        for shape in args.shapes:
+            config = dumps({**SHAPES[shape], 'prices': prices})
+            times = [measure_probe(cwd, 'execute', config, args.repeat) for cwd in [folder, here]]
+            print(f'{shape}: {args.revision} {times[0] / args.length * 1e6:.2f}us per step, working tree {times[1] / args.length * 1e6:.2f}us per step, speedup {times[0] / times[1]:.2f}x')
+
+def prices(args):
+    # bucketed market data repeats its prices a lot, unlike the synthetic series of the other benchmarks
+    config = load_config(args.config_file_name)
+    config['prices'] = config['prices'] * args.tile
+    length = len(config['prices'])
+    with TemporaryDirectory(prefix='simulation_') as folder:
+        extract_core(args.revision, folder)
+        print(f'steps: {length}, distinct prices: {len(set(config["prices"]))}')
+        for function_name in ['execute', 'execute_events']:
+            times = [measure_probe(cwd, function_name, dumps(config), args.repeat) for cwd in [folder, here]]
+            print(f'{function_name}: {args.revision} {times[0] / length * 1e6:.2f}us per step, working tree {times[1] / length * 1e6:.2f}us per step, speedup {times[0] / times[1]:.2f}x')
+
+def sparse(args):
+    from tracemalloc import start, stop, get_traced_memory
+    from core import run_simulation
+
+    config = range_bound_config(args.length)
+    results = {}
+    for recording in ['dense', 'sparse', 'summary_only']:
+        start()
+        elapsed, output = measure(run_simulation, {**config, 'recording': recording})
+        peak = get_traced_memory()[1]
+        stop()
+        results[recording] = elapsed, peak, len(dumps(output))
+    print(f'steps: {args.length}, trades: {output["trades"]}')
+    for recording, (elapsed, peak, size) in results.items():
+        print(f'{recording}: {elapsed:.3f}s, peak memory {peak / 1e6:.1f}MB, output {size / 1e6:.2f}MB')
+
+def engines(args):
+    from core import run_simulation
+
+    print(f'steps: {args.length}')
+    prices = mean_reverting_prices(args.length)
+    for shape in args.shapes:
+        # every engine converts its numbers into the output text in its own way, so that is measured along with the simulation
+        times = {engine: measure_best(args.budget, args.repeat, run_simulation, {**SHAPES[shape], 'prices': prices, 'engine': engine})[0] for engine in ['decimal', 'fixed', 'float']}
+        print(f'{shape}: ' + ', '.join(f'{engine} {elapsed / args.length * 1e6:.2f}us per step' for engine, elapsed in times.items()) + f', fixed speedup {times["decimal"] / times["fixed"]:.2f}x')
+
+def index(args):
+    from core import create_price_index, find_next_trade, search_next_trade, strToDec, create_context
+    from core.sparse import execute_sparse
+
+    setcontext(create_context())
+
+    config = strToDec(range_bound_config(args.length))
+    prices = config['prices']
+    # every strategy widens the ranges of the previous one, and asks for the next trade from the start and after each of its trades
+    queries = []
+    for n in range(args.count):
+        sparse = execute_sparse({**config, 'low_range_low_price': config['low_range_low_price'] - n, 'high_range_high_price': config['high_range_high_price'] + n})
+        trades = sparse['trades']
+        queries.append((0, sparse['initial']['bid'], sparse['initial']['ask']))
+        queries += [(step + 1, bid, ask) for step, bid, ask in zip(trades['step'], trades['bid'], trades['ask'])]
+
+    scan_time, scan_steps = measure(lambda: [find_next_trade(prices, *query) for query in queries])
+    build_time, price_index = measure(create_price_index, prices)
+    search_time, search_steps = measure(lambda: [search_next_trade(price_index, *query) for query in queries])
+
+    assert scan_steps == search_steps, 'the index finds other steps than the scan'
+
+    print(f'steps: {args.length}, strategies: {args.count}, queries: {len(queries)}')
+    print(f'scan: {scan_time:.3f}s total, {scan_time / len(queries) * 1e6:.1f}us per query')
+    print(f'index: {build_time:.3f}s to build, {search_time:.3f}s total, {search_time / len(queries) * 1e6:.1f}us per query')
+    print(f'speedup: {scan_time / (build_time + search_time):.1f}x including the build, {scan_time / search_time:.1f}x excluding it')
+
+parser = ArgumentParser()
+subparsers = parser.add_subparsers(required=True)
+
+worker_parser = subparsers.add_parser('worker', help='spawning run.py per request versus a persistent worker')
+worker_parser.add_argument('-c', '--config-file-name', default=path.join(here, 'example_config.json'))
+worker_parser.add_argument('-n', '--count', type=int, default=20)
+worker_parser.set_defaults(function=worker)
+
+events_parser = subparsers.add_parser('events', help='step-by-step versus event-driven execution on a range-bound series')
+events_parser.add_argument('-l', '--length', type=int, default=20000)
+events_parser.set_defaults(function=events)
+
+columnar_parser = subparsers.add_parser('columnar', help='json versus columnar binary output')
+columnar_parser.add_argument('-c', '--config-file-name', default=path.join(here, 'example_config.json'))
+columnar_parser.add_argument('-r', '--repeat', type=int, default=10, help='repeat the price series this many times')
+columnar_parser.set_defaults(function=columnar)
+
+startup_parser = subparsers.add_parser('startup', help='import time and cold start of run.py, with and without logging')
+startup_parser.add_argument('-c', '--config-file-name', default=path.join(here, 'example_config.json'))
+startup_parser.add_argument('-l', '--length', type=int, default=10, help='the number of steps to simulate')
+startup_parser.add_argument('-n', '--count', type=int, default=10)
+startup_parser.set_defaults(function=startup)
+
+logger_parser = subparsers.add_parser('logger', help='the per-step overhead of logging')
+logger_parser.add_argument('-c', '--config-file-name', default=path.join(here, 'example_config.json'))
+logger_parser.add_argument('-l', '--length', type=int, default=10000, help='the number of steps to simulate')
+logger_parser.set_defaults(function=logger)
+
+suite_parser = subparsers.add_parser('suite', help='the core phases and run.py across series lengths and strategy shapes')
+suite_parser.add_argument('-l', '--lengths', type=int, nargs='+', default=[100, 1000, 10000, 100000, 1000000])
+suite_parser.add_argument('-s', '--shapes', choices=list(SHAPES), nargs='+', default=list(SHAPES))
+suite_parser.add_argument('-r', '--repeat', type=int, default=5, help='the maximum number of runs, of which the best is reported')
+suite_parser.add_argument('-t', '--budget', type=float, default=1.0, help='the number of seconds within which repeated runs must fit')
+suite_parser.add_argument('-g', '--max-logging-length', type=int, default=10000, help='the longest series to measure with logging')
+suite_parser.add_argument('-o', '--output-file-name', default=None, help='write the results as json into this file')
+suite_parser.add_argument('-b', '--baseline', default=None, help='compare the results against this baseline file')
+suite_parser.add_argument('-x', '--threshold', type=float, default=0.2, help='the relative slowdown which is reported as a regression')
+suite_parser.set_defaults(function=suite)
+
+compare_parser = subparsers.add_parser('compare', help='compare the results of two suite runs')
+compare_parser.add_argument('baseline')
+compare_parser.add_argument('current')
+compare_parser.add_argument('-x', '--threshold', type=float, default=0.2, help='the relative slowdown which is reported as a regression')
+compare_parser.set_defaults(function=compare)
+
+revision_parser = subparsers.add_parser('revision', help='the per-step cost of step-by-step execution against an earlier git revision')
+revision_parser.add_argument('-r', '--revision', default='HEAD')
+revision_parser.add_argument('-l', '--length', type=int, default=100000, help='the number of steps to simulate')
+revision_parser.add_argument('-s', '--shapes', choices=list(SHAPES), nargs='+', default=list(SHAPES))
+revision_parser.add_argument('-n', '--count', type=int, dest='repeat', default=3, help='the number of runs, of which the best is reported')
+revision_parser.set_defaults(function=revision)
+
+prices_parser = subparsers.add_parser('prices', help='both execution modes on real bucketed prices against an earlier git revision')
+prices_parser.add_argument('-c', '--config-file-name', default=path.join(here, 'example_config.json'))
+prices_parser.add_argument('-r', '--revision', default='HEAD')
+prices_parser.add_argument('-t', '--tile', type=int, default=10, help='repeat the price series this many times')
+prices_parser.add_argument('-n', '--count', type=int, dest='repeat', default=5, help='the number of runs, of which the best is reported')
+prices_parser.set_defaults(function=prices)
+
+sparse_parser = subparsers.add_parser('sparse', help='dense versus sparse versus summary-only recording on a range-bound series')
+sparse_parser.add_argument('-l', '--length', type=int, default=100000)
+sparse_parser.set_defaults(function=sparse)
+
+engines_parser = subparsers.add_parser('engines', help='the per-step cost of every engine across strategy shapes')
+engines_parser.add_argument('-l', '--length', type=int, default=10000, help='the number of steps to simulate')
+engines_parser.add_argument('-s', '--shapes', choices=list(SHAPES), nargs='+', default=list(SHAPES))
+engines_parser.add_argument('-r', '--repeat', type=int, default=5, help='the maximum number of runs, of which the best is reported')
+engines_parser.add_argument('-t', '--budget', type=float, default=2.0, help='the number of seconds within which repeated runs must fit')
+engines_parser.set_defaults(function=engines)
+
+index_parser = subparsers.add_parser('index', help='scanning the prices versus searching a shared index for the next trade')
+index_parser.add_argument('-l', '--length', type=int, default=100000)
+index_parser.add_argument('-n', '--count', type=int, default=10, help='the number of strategies sharing the index')
+index_parser.set_defaults(function=index)
+
+args = parser.parse_args()
+args.function(args)
@@ -1,16 +1,31 @@
 from .logger import create_logger
+from .profiler import create_profiler, FakeProfiler
 
 from decimal import Decimal
-from decimal import getcontext
+from decimal import Context
+from decimal import localcontext
 from decimal import ROUND_HALF_DOWN
 
-getcontext().prec = 100
-getcontext().rounding = ROUND_HALF_DOWN
-
 ZERO = Decimal('0')
 ONE = Decimal('1')
 TWO = Decimal('2')
 
+# the configuration keys which select how a simulation runs, rather than what it simulates
+OPTIONS = ['logging', 'engine', 'profiling', 'precision', 'recording']
+
+# the precision of the output's reference, which is the lowest one that reproduces it byte for byte on the corpus of `precision.py`, so a precision may only be raised
+PRECISION = 100
+MIN_PRECISION = PRECISION
+
+def create_context(precision: int = PRECISION) -> Context:
+    return Context(prec=precision, rounding=ROUND_HALF_DOWN)
+
+def get_context(config: dict) -> Context:
+    # every simulation runs in a local context, so that neither its precision nor its rounding leaks into other code
+    precision = int(config['precision']) if 'precision' in config else PRECISION
+    assert MIN_PRECISION <= precision, f'precision {precision} is not proven to reproduce the output'
+    return create_context(precision)
+
 def calculate_parameters(y: Decimal, pa: Decimal, pb: Decimal, pm: Decimal, n: Decimal) -> (Decimal, Decimal, Decimal, Decimal):
     H = pa.sqrt() ** n
     L = pb.sqrt() ** n
@@ -21,70 +36,169 @@ def calculate_parameters(y: Decimal, pa: Decimal, pb: Decimal, pm: Decimal, n: D
     w = z / (H * L)
     return A, B, z, w
 
-def calculate_hodl_value(carbon: dict, market_price: Decimal) -> Decimal:
-    CASH = carbon['simulation_recorder']['CASH']['balance'][0]
-    RISK = carbon['simulation_recorder']['RISK']['balance'][0] * market_price
+ORDERS = ['CASH', 'RISK']
+BOUNDS = ['min_bid', 'max_bid', 'min_ask', 'max_ask']
+SERIES = ['bid', 'ask', 'hodl_value', 'portfolio_cash', 'portfolio_risk', 'portfolio_value', 'portfolio_over_hodl']
+
+class Order:
+    __slots__ = ['name', 'A', 'B', 'z', 'y', 'fee', 'initial_y', 'balances', 'fees']
+
+    def __init__(self, name: str, A: Decimal, B: Decimal, z: Decimal, y: Decimal, fee: Decimal, initial_y: Decimal):
+        self.name = name
+        self.A = A
+        self.B = B
+        self.z = z
+        self.y = y
+        self.fee = fee
+        self.initial_y = initial_y
+        self.balances = []
+        self.fees = []
+
+class Carbon:
+    __slots__ = ['CASH', 'RISK', 'inverse_fee', *BOUNDS, 'steps', *SERIES]
+
+    def __init__(self, CASH: Order, RISK: Order, inverse_fee: Decimal, min_bid: Decimal, max_bid: Decimal, min_ask: Decimal, max_ask: Decimal):
+        self.CASH = CASH
+        self.RISK = RISK
+        self.inverse_fee = inverse_fee
+        self.min_bid = min_bid
+        self.max_bid = max_bid
+        self.min_ask = min_ask
+        self.max_ask = max_ask
+        allocate(self, 0)
+
+class PriceTable:
+    __slots__ = ['inverse_fee', 'prices', 'indices', 'hodl_values', 'roots']
+
+    def __init__(self, inverse_fee: Decimal, prices: list, indices: list, hodl_values: list):
+        self.inverse_fee = inverse_fee
+        self.prices = prices
+        self.indices = indices
+        self.hodl_values = hodl_values
+        self.roots = [None] * len(prices)
+
+class PriceIndex:
+    __slots__ = ['prices', 'maxima', 'minima']
+
+    def __init__(self, prices: list, maxima: list, minima: list):
+        self.prices = prices
+        self.maxima = maxima
+        self.minima = minima
+
+def allocate(carbon: Carbon, length: int) -> None:
+    # every series is allocated up front and filled by index, as the number of steps is known
+    carbon.steps = 0
+    for order in [carbon.CASH, carbon.RISK]:
+        order.balances = [None] * length
+        order.fees = [None] * length
+    for key in SERIES:
+        setattr(carbon, key, [None] * length)
+
+def calculate_hodl_value(carbon: Carbon, market_price: Decimal) -> Decimal:
+    CASH = carbon.CASH.initial_y
+    RISK = carbon.RISK.initial_y * market_price
     return CASH + RISK
 
-def calculate_portfolio(carbon: dict, market_price: Decimal) -> (Decimal, Decimal, Decimal):
-    CASH = carbon['simulation_recorder']['CASH']['balance'][-1]
-    RISK = carbon['simulation_recorder']['RISK']['balance'][-1] * market_price
+def calculate_portfolio(carbon: Carbon, market_price: Decimal) -> (Decimal, Decimal, Decimal):
+    CASH = carbon.CASH.y
+    RISK = carbon.RISK.y * market_price
     return CASH, RISK, CASH + RISK
 
 def calculate_portfolio_over_hodl(hodl_value: Decimal, portfolio_value: Decimal) -> Decimal:
     return 100 * (portfolio_value - hodl_value) / hodl_value
 
-def get_trade_parameters(carbon: dict, order: str) -> (Decimal, Decimal, Decimal, Decimal):
-    y = carbon['simulation_recorder'][order]['balance'][-1]
-    z = carbon['curve_parameters'][order]['z']
-    A = carbon['curve_parameters'][order]['A']
-    B = carbon['curve_parameters'][order]['B']
-    return y, z, A, B
-
-def calculate_quote(carbon: dict, order: str, inverse_fee: Decimal) -> (Decimal, Decimal):
-    y, z, A, B = get_trade_parameters(carbon, order)
-    return inverse_fee * (A * y + B * z) ** TWO, z ** TWO
-
-def calculate_quotes(carbon: dict) -> (Decimal, Decimal):
-    inverse_fee = carbon['curve_parameters']['inverse_fee']
-    bid_n, bid_d = calculate_quote(carbon, 'CASH', inverse_fee)
-    ask_d, ask_n = calculate_quote(carbon, 'RISK', inverse_fee)
+def calculate_quote(order: Order, inverse_fee: Decimal) -> (Decimal, Decimal):
+    return inverse_fee * (order.A * order.y + order.B * order.z) ** TWO, order.z ** TWO
+
+def calculate_quotes(carbon: Carbon) -> (Decimal, Decimal):
+    bid_n, bid_d = calculate_quote(carbon.CASH, carbon.inverse_fee)
+    ask_d, ask_n = calculate_quote(carbon.RISK, carbon.inverse_fee)
     return bid_n / bid_d, ask_n / ask_d
 
-def calculate_dy(market_price: Decimal, unit_price: Decimal, inverse_fee: Decimal, y: Decimal, z: Decimal, A: Decimal, B: Decimal) -> Decimal:
-    return z * ((market_price * inverse_fee).sqrt() - B * unit_price * inverse_fee) / (A * unit_price * inverse_fee) - y if A > ZERO else -y
+def calculate_root(market_price: Decimal, inverse_fee: Decimal) -> Decimal:
+    return (market_price * inverse_fee).sqrt()
+
+def calculate_dy(root: Decimal, unit_price: Decimal, inverse_fee: Decimal, y: Decimal, z: Decimal, A: Decimal, B: Decimal) -> Decimal:
+    return z * (root - B * unit_price * inverse_fee) / (A * unit_price * inverse_fee) - y if A > ZERO else -y
 
 def calculate_dx(dy: Decimal, y: Decimal, z: Decimal, A: Decimal, B: Decimal) -> Decimal:
     return -dy * z ** TWO / (A * dy * (A * y + B * z) + (A * y + B * z) ** TWO)
 
-def apply_trade(carbon: dict, order_x: str, order_y: str, action: str, market_price: Decimal, unit_price: Decimal) -> dict:
-    inverse_fee = carbon['curve_parameters']['inverse_fee']
-    y, z, A, B = get_trade_parameters(carbon, order_y)
-    dy = calculate_dy(market_price, unit_price, inverse_fee, y, z, A, B)
+def create_price_table(carbon: Carbon, prices: list) -> PriceTable:
+    # every distinct price gets a row, which holds the terms that depend on nothing but the price
+    rows = {}
+    indices = [rows.setdefault(price, len(rows)) for price in prices]
+    return PriceTable(carbon.inverse_fee, list(rows), indices, [calculate_hodl_value(carbon, price) for price in rows])
+
+def get_root(table: PriceTable, index: int) -> Decimal:
+    # the root is only needed where an order with a range trades, so it is calculated upon the first such trade at each price
+    root = table.roots[index]
+    if root is None:
+        root = table.roots[index] = calculate_root(table.prices[index], table.inverse_fee)
+    return root
+
+def apply_trade(carbon: Carbon, order_x: Order, order_y: Order, action: str, table: PriceTable, index: int, unit_price: Decimal) -> dict:
+    inverse_fee = carbon.inverse_fee
+    y, z, A, B = order_y.y, order_y.z, order_y.A, order_y.B
+    root = get_root(table, index) if A > ZERO else None
+    dy = calculate_dy(root, unit_price, inverse_fee, y, z, A, B)
     out_of_range = {'before': dy < -y, 'after': y == ZERO}
     if dy < -y:
         dy = -y
     dx = calculate_dx(dy, y, z, A, B)
-    carbon['simulation_recorder'][order_x]['balance'][-1] += dx
-    carbon['simulation_recorder'][order_y]['balance'][-1] += dy
-    carbon['simulation_recorder'][order_y]['fee'][-1] -= dy * (ONE - inverse_fee)
-    if carbon['curve_parameters'][order_x]['z'] < carbon['simulation_recorder'][order_x]['balance'][-1]:
-        carbon['curve_parameters'][order_x]['z'] = carbon['simulation_recorder'][order_x]['balance'][-1]
-    return {'out_of_range': out_of_range, 'action': action, order_x: dx, order_y: -dy * inverse_fee}
-
-def replicate_last_balance_and_fee(carbon: dict) -> None:
-    for order, parameter in [(order, parameter) for order in ['CASH', 'RISK'] for parameter in ['balance', 'fee']]:
-        carbon['simulation_recorder'][order][parameter].append(carbon['simulation_recorder'][order][parameter][-1])
-
-def remove_first_balance_and_fee(carbon: dict) -> None:
-    for order, parameter in [(order, parameter) for order in ['CASH', 'RISK'] for parameter in ['balance', 'fee']]:
-        carbon['simulation_recorder'][order][parameter].pop(0)
-
-def equilibrate_protocol(carbon: dict, market_price: Decimal, bid: Decimal, ask: Decimal) -> dict:
+    balances = order_x.y, order_y.y
+    order_x.y += dx
+    order_y.y += dy
+    order_y.fee -= dy * (ONE - inverse_fee)
+    if order_x.z < order_x.y:
+        order_x.z = order_x.y
+    # a price beyond the range of a drained order leaves every balance as it is, which is no trade
+    filled = (order_x.y, order_y.y) != balances
+    return {'filled': filled, 'out_of_range': out_of_range, 'action': action, order_x.name: dx, order_y.name: -dy * inverse_fee}
+
+def record_steps(carbon: Carbon, table: PriceTable, first: int, last: int, bid: Decimal, ask: Decimal) -> None:
+    start = carbon.steps
+    end = start + last - first
+    for order in [carbon.CASH, carbon.RISK]:
+        order.balances[start:end] = [order.y] * (last - first)
+        order.fees[start:end] = [order.fee] * (last - first)
+    carbon.bid[start:end] = [bid] * (last - first)
+    carbon.ask[start:end] = [ask] * (last - first)
+    for step, index in enumerate(table.indices[first:last], start):
+        price = table.prices[index]
+        hodl_value = table.hodl_values[index]
+        portfolio_cash, portfolio_risk, portfolio_value = calculate_portfolio(carbon, price)
+        carbon.hodl_value[step] = hodl_value
+        carbon.portfolio_cash[step] = portfolio_cash
+        carbon.portfolio_risk[step] = portfolio_risk
+        carbon.portfolio_value[step] = portfolio_value
+        carbon.portfolio_over_hodl[step] = calculate_portfolio_over_hodl(hodl_value, portfolio_value)
+    carbon.steps = end
+
+def record_step(carbon: Carbon, table: PriceTable, index: int, bid: Decimal, ask: Decimal) -> None:
+    step = carbon.steps
+    CASH, RISK = carbon.CASH, carbon.RISK
+    CASH.balances[step] = CASH.y
+    CASH.fees[step] = CASH.fee
+    RISK.balances[step] = RISK.y
+    RISK.fees[step] = RISK.fee
+    carbon.bid[step] = bid
+    carbon.ask[step] = ask
+    hodl_value = table.hodl_values[index]
+    portfolio_cash, portfolio_risk, portfolio_value = calculate_portfolio(carbon, table.prices[index])
+    carbon.hodl_value[step] = hodl_value
+    carbon.portfolio_cash[step] = portfolio_cash
+    carbon.portfolio_risk[step] = portfolio_risk
+    carbon.portfolio_value[step] = portfolio_value
+    carbon.portfolio_over_hodl[step] = calculate_portfolio_over_hodl(hodl_value, portfolio_value)
+    carbon.steps = step + 1
+
+def equilibrate_protocol(carbon: Carbon, table: PriceTable, index: int, bid: Decimal, ask: Decimal) -> dict:
+    market_price = table.prices[index]
     if market_price > ask:
-        return apply_trade(carbon, 'CASH', 'RISK', 'bought', market_price, market_price)
+        return apply_trade(carbon, carbon.CASH, carbon.RISK, 'bought', table, index, market_price)
     if market_price < bid:
-        return apply_trade(carbon, 'RISK', 'CASH', 'sold', market_price, ONE)
+        return apply_trade(carbon, carbon.RISK, carbon.CASH, 'sold', table, index, ONE)
     return {}
 
 def is_valid(config: dict) -> bool:
@@ -103,7 +217,7 @@ def is_valid(config: dict) -> bool:
         all(ZERO < price for price in c.prices)
     ])
 
-def create_carbon(config: dict) -> dict:
+def create_carbon(config: dict) -> Carbon:
     assert is_valid(config), 'invalid configuration'
     inverse_fee = ONE - config['network_fee']
     y_CASH = config['portfolio_cash_value']
@@ -114,53 +228,147 @@ def create_carbon(config: dict) -> dict:
     A_RISK, B_RISK, z_RISK, w_RISK = calculate_parameters(y_RISK, l_RISK, h_RISK, s_RISK, -ONE)
     if z_CASH == ZERO: z_CASH = w_RISK
     if z_RISK == ZERO: z_RISK = w_CASH
+    carbon = Carbon(
+        Order('CASH', A_CASH, B_CASH, z_CASH, y_CASH, ZERO, y_CASH),
+        Order('RISK', A_RISK, B_RISK, z_RISK, y_RISK, ZERO, y_RISK),
+        inverse_fee,
+        l_CASH * inverse_fee,
+        h_CASH * inverse_fee,
+        l_RISK / inverse_fee,
+        h_RISK / inverse_fee
+    )
+    allocate(carbon, len(config['prices']))
+    return carbon
+
+def execute(config_carbon: dict, config_logger: dict, profiler: any = FakeProfiler()) -> dict:
+    logger = profiler.phase('logger', create_logger, config_logger)
+    carbon = create_carbon(config_carbon)
+    table = profiler.phase('prices', create_price_table, carbon, config_carbon['prices'])
+    bid, ask = profiler.quotes(calculate_quotes, carbon)
+    profiler.count('steps', len(config_carbon['prices']))
+    for step, (price, index) in enumerate(zip(config_carbon['prices'], table.indices)):
+        profiler.phase('logger', logger.update_before, carbon, step, price, bid, ask)
+        details = profiler.trade(equilibrate_protocol(carbon, table, index, bid, ask))
+        if details:
+            bid, ask = profiler.quotes(calculate_quotes, carbon)
+        record_step(carbon, table, index, bid, ask)
+        profiler.phase('logger', logger.update_after, carbon, details, price, bid, ask)
+    profiler.phase('logger', logger.close)
+    return complete_recorder(carbon)
+
+def find_next_trade(prices: list, start: int, bid: Decimal, ask: Decimal) -> int:
+    for step in range(start, len(prices)):
+        if prices[step] > ask or prices[step] < bid:
+            return step
+    return len(prices)
+
+# the prices are indexed in blocks, which keeps the index about as cheap to build as a few scans of the prices
+BLOCK_SIZE = 16
+
+def create_price_index(prices: list) -> PriceIndex:
+    # level k holds the highest and the lowest price of the 2 ** k blocks from every block on
+    blocks = range(0, len(prices), BLOCK_SIZE)
+    maxima = [[max(prices[start:start + BLOCK_SIZE]) for start in blocks]]
+    minima = [[min(prices[start:start + BLOCK_SIZE]) for start in blocks]]
+    width = 1
+    while 2 * width <= len(maxima[0]):
+        maxima.append(list(map(max, maxima[-1], maxima[-1][width:])))
+        minima.append(list(map(min, minima[-1], minima[-1][width:])))
+        width *= 2
+    return PriceIndex(prices, maxima, minima)
+
+def skip_blocks(index: PriceIndex, block: int, bid: Decimal, ask: Decimal) -> int:
+    # the blocks within the spread are skipped in runs which double until one holds a price outside of it,
+    # and which then halve down to that block, so that a gap of n blocks takes O(log n) comparisons
+    maxima, minima = index.maxima, index.minima
+    length = len(maxima[0])
+    level = 0
+    while level < len(maxima) and block + (1 << level) <= length and maxima[level][block] <= ask and minima[level][block] >= bid:
+        block += 1 << level
+        level += 1
+    while level > 0:
+        level -= 1
+        if block + (1 << level) <= length and maxima[level][block] <= ask and minima[level][block] >= bid:
+            block += 1 << level
+    return block
+
+def search_next_trade(index: PriceIndex, start: int, bid: Decimal, ask: Decimal) -> int:
+    # the same as `find_next_trade`, where the rest of the first block is scanned, and so is the block which the index finds to hold the next trade
+    prices = index.prices
+    end = min(len(prices), start - start % BLOCK_SIZE + BLOCK_SIZE)
+    for step in range(start, end):
+        if prices[step] > ask or prices[step] < bid:
+            return step
+    if end == len(prices):
+        return end
+    start = skip_blocks(index, end // BLOCK_SIZE, bid, ask) * BLOCK_SIZE
+    for step in range(start, min(len(prices), start + BLOCK_SIZE)):
+        if prices[step] > ask or prices[step] < bid:
+            return step
+    return len(prices)
+
+def execute_steps(carbon: Carbon, prices: list, bid: Decimal, ask: Decimal, profiler: any = FakeProfiler(), index: PriceIndex = None) -> (Decimal, Decimal):
+    table = profiler.phase('prices', create_price_table, carbon, prices)
+    profiler.count('steps', len(prices))
+    step = 0
+    while step < len(prices):
+        # the balances, the fees and the quotes remain constant until the market price leaves the spread
+        # an index pays off once it is shared by many simulations over the same prices, so a single one scans them
+        trade_step = find_next_trade(prices, step, bid, ask) if index is None else search_next_trade(index, step, bid, ask)
+        record_steps(carbon, table, step, trade_step, bid, ask)
+        if trade_step < len(prices):
+            row = table.indices[trade_step]
+            profiler.trade(equilibrate_protocol(carbon, table, row, bid, ask))
+            bid, ask = profiler.quotes(calculate_quotes, carbon)
+            record_step(carbon, table, row, bid, ask)
+        step = trade_step + 1
+    return bid, ask
+
+def get_curve_parameters(carbon: Carbon) -> dict:
     return {
-        'curve_parameters': {
-            'CASH': {'A': A_CASH, 'B': B_CASH, 'z': z_CASH},
-            'RISK': {'A': A_RISK, 'B': B_RISK, 'z': z_RISK},
-            'inverse_fee': inverse_fee
-        },
-        'simulation_recorder': {
-            'CASH': {'balance': [y_CASH], 'fee': [ZERO]},
-            'RISK': {'balance': [y_RISK], 'fee': [ZERO]},
-            'min_bid': l_CASH * inverse_fee,
-            'max_bid': h_CASH * inverse_fee,
-            'min_ask': l_RISK / inverse_fee,
-            'max_ask': h_RISK / inverse_fee,
-            'bid': [],
-            'ask': [],
-            'hodl_value': [],
-            'portfolio_cash': [],
-            'portfolio_risk': [],
-            'portfolio_value': [],
-            'portfolio_over_hodl': []
-        }
+        **{order.name: {'A': order.A, 'B': order.B, 'z': order.z} for order in [carbon.CASH, carbon.RISK]},
+        'inverse_fee': carbon.inverse_fee
     }
 
-def execute(config_carbon: dict, config_logger: dict) -> dict:
-    logger = create_logger(config_logger)
+def complete_recorder(carbon: Carbon) -> dict:
+    return {
+        **{order.name: {'balance': order.balances, 'fee': order.fees} for order in [carbon.CASH, carbon.RISK]},
+        **{key: getattr(carbon, key) for key in BOUNDS},
+        **{key: getattr(carbon, key) for key in SERIES},
+        'curve_parameters': get_curve_parameters(carbon)
+    }
+
+def execute_events(config_carbon: dict, profiler: any = FakeProfiler()) -> dict:
     carbon = create_carbon(config_carbon)
+    bid, ask = profiler.quotes(calculate_quotes, carbon)
+    execute_steps(carbon, config_carbon['prices'], bid, ask, profiler)
+    return complete_recorder(carbon)
+
+def execute_iter(config_carbon: dict) -> iter:
+    carbon = create_carbon({**config_carbon, 'prices': []})
+    yield {key: getattr(carbon, key) for key in BOUNDS}
     bid, ask = calculate_quotes(carbon)
-    for step, price in enumerate(config_carbon['prices']):
-        logger.update_before(carbon['simulation_recorder'], step, price, bid, ask)
-        replicate_last_balance_and_fee(carbon)
-        details = equilibrate_protocol(carbon, price, bid, ask)
-        bid, ask = calculate_quotes(carbon)
-        hodl_value = calculate_hodl_value(carbon, price)
+    for price in config_carbon['prices']:
+        assert ZERO < price, 'invalid configuration'
+        # the balances are updated in place, and the table holds the current price only, so the state does not grow with the number of steps
+        table = create_price_table(carbon, [price])
+        details = equilibrate_protocol(carbon, table, 0, bid, ask)
+        if details:
+            bid, ask = calculate_quotes(carbon)
+        hodl_value = table.hodl_values[0]
         portfolio_cash, portfolio_risk, portfolio_value = calculate_portfolio(carbon, price)
-        portfolio_over_hodl = calculate_portfolio_over_hodl(hodl_value, portfolio_value)
-        carbon['simulation_recorder']['bid'].append(bid)
-        carbon['simulation_recorder']['ask'].append(ask)
-        carbon['simulation_recorder']['hodl_value'].append(hodl_value)
-        carbon['simulation_recorder']['portfolio_cash'].append(portfolio_cash)
-        carbon['simulation_recorder']['portfolio_risk'].append(portfolio_risk)
-        carbon['simulation_recorder']['portfolio_value'].append(portfolio_value)
-        carbon['simulation_recorder']['portfolio_over_hodl'].append(portfolio_over_hodl)
-        logger.update_after(carbon['simulation_recorder'], details, price, bid, ask)
-    logger.close()
-    remove_first_balance_and_fee(carbon)
-    carbon['simulation_recorder']['curve_parameters'] = carbon['curve_parameters']
-    return carbon['simulation_recorder']
+        yield {
+            'CASH': {'balance': carbon.CASH.y, 'fee': carbon.CASH.fee},
+            'RISK': {'balance': carbon.RISK.y, 'fee': carbon.RISK.fee},
+            'bid': bid,
+            'ask': ask,
+            'hodl_value': hodl_value,
+            'portfolio_cash': portfolio_cash,
+            'portfolio_risk': portfolio_risk,
+            'portfolio_value': portfolio_value,
+            'portfolio_over_hodl': calculate_portfolio_over_hodl(hodl_value, portfolio_value)
+        }
+    yield {'curve_parameters': get_curve_parameters(carbon)}
 
 def strToDec(obj: any) -> any:
     if type(obj) is str:
@@ -180,7 +388,73 @@ def decToStr(obj: any) -> any:
         return {key: decToStr(val) for key, val in obj.items()}
     raise Exception(f'illegal type {type(obj).__name__}')
 
-def run_simulation(config: dict) -> dict:
-    config_carbon = {key: val for key, val in config.items() if key != 'logging'}
+def simulate(config: dict, profiler: any = FakeProfiler()) -> dict:
+    with localcontext(get_context(config)):
+        return simulate_in_context(config, profiler)
+
+RECORDINGS = ['dense', 'sparse', 'summary_only']
+
+def get_recording(config: dict) -> str:
+    recording = config['recording'] if 'recording' in config else 'dense'
+    if recording not in RECORDINGS:
+        raise Exception(f'illegal recording {recording}')
+    return recording
+
+def check_dense_decimal(config: dict, mode: str) -> None:
+    # a mode which runs the dense decimal engine itself supports no option which selects another engine, another recording or a log
+    engine = config['engine'] if 'engine' in config else 'decimal'
+    assert engine == 'decimal', f'the {engine} engine is not supported by {mode}'
+    recording = get_recording(config)
+    assert recording == 'dense', f'{recording} recording is not supported by {mode}'
+    assert not ('logging' in config and config['logging']), f'logging is not supported by {mode}'
+
+def simulate_in_context(config: dict, profiler: any) -> dict:
+    config_carbon = {key: val for key, val in config.items() if key not in OPTIONS}
     config_logger = config['logging'] if 'logging' in config else {}
-    return decToStr(execute(strToDec(config_carbon), config_logger))
+    engine = config['engine'] if 'engine' in config else 'decimal'
+    recording = get_recording(config)
+    if recording != 'dense':
+        assert engine == 'decimal' and not config_logger, f'{recording} recording is only supported by the decimal engine without logging'
+        if recording == 'summary_only':
+            from .summary import execute_summary
+            return profiler.phase('execute', execute_summary, profiler.phase('strToDec', strToDec, config_carbon), profiler)
+        from .sparse import execute_sparse
+        return profiler.phase('execute', execute_sparse, profiler.phase('strToDec', strToDec, config_carbon), profiler)
+    if engine == 'float':
+        assert not config_logger, 'logging is only supported by the decimal engine'
+        from .float_engine import execute as execute_float, strToFloat
+        return profiler.phase('execute', execute_float, profiler.phase('strToFloat', strToFloat, config_carbon))
+    if engine == 'fixed':
+        assert not config_logger, 'logging is only supported by the decimal engine'
+        from .fixed_engine import execute as execute_fixed
+        return profiler.phase('execute', execute_fixed, profiler.phase('strToDec', strToDec, config_carbon))
+    if engine != 'decimal':
+        raise Exception(f'illegal engine {engine}')
+    if config_logger:
+        return profiler.phase('execute', execute, profiler.phase('strToDec', strToDec, config_carbon), config_logger, profiler)
+    return profiler.phase('execute', execute_events, profiler.phase('strToDec', strToDec, config_carbon), profiler)
+
+def run_simulation(config: dict, profiler: any = None) -> dict:
+    # a profiler which is passed in is reported by the caller, which may add phases of its own
+    owner = profiler is None
+    if owner:
+        profiler = create_profiler(config)
+    # `decToStr` rounds via the context as well
+    with localcontext(get_context(config)):
+        if 'engine' in config and config['engine'] == 'float':
+            from .float_engine import floatToStr
+            output = profiler.phase('floatToStr', floatToStr, simulate_in_context(config, profiler))
+        elif 'engine' in config and config['engine'] == 'fixed':
+            from .fixed_engine import amountToStr
+            output = profiler.phase('amountToStr', amountToStr, simulate_in_context(config, profiler))
+        elif get_recording(config) == 'sparse':
+            from .sparse import sparseToStr
+            output = profiler.phase('decToStr', sparseToStr, simulate_in_context(config, profiler))
+        elif get_recording(config) == 'summary_only':
+            from .summary import summaryToStr
+            output = profiler.phase('decToStr', summaryToStr, simulate_in_context(config, profiler))
+        else:
+            output = profiler.phase('decToStr', decToStr, simulate_in_context(config, profiler))
+    if owner:
+        profiler.report()
+    return output
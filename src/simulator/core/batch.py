@@ -0,0 +1,36 @@
+from decimal import localcontext
+
+from . import PRECISION, ZERO, get_context, is_valid, allocate, create_carbon, create_price_index, calculate_quotes, execute_steps, complete_recorder, strToDec, decToStr
+
+def execute_batch(prices: list, configs: list) -> list:
+    assert all(ZERO < price for price in prices), 'invalid configuration'
+    # the prices are checked and indexed once, and every strategy jumps from one trade to the next one through the shared index
+    index = create_price_index(prices)
+    # every strategy is created before any of them is executed, so that an invalid one fails the batch before any work is done
+    carbons = [create_carbon({**config, 'prices': []}) for config in configs]
+    # the strategies are executed one after another rather than in lockstep, on purpose: each one jumps over the steps at which it does not trade
+    # and records them in bulk, which stepping all of them together would break up at every trade of any other one, and the decimal arithmetic is per strategy anyway
+    outputs = []
+    for carbon in carbons:
+        allocate(carbon, len(prices))
+        bid, ask = calculate_quotes(carbon)
+        execute_steps(carbon, prices, bid, ask, index=index)
+        outputs.append(complete_recorder(carbon))
+    return outputs
+
+def run_simulations(prices: list, configs: list, engine: str = 'decimal', precision: int = PRECISION) -> list:
+    if engine == 'float':
+        from .float_engine import run_simulations as run_float_simulations
+        return run_float_simulations(prices, configs)
+    if engine not in ['decimal', 'fixed']:
+        raise Exception(f'illegal engine {engine}')
+    with localcontext(get_context({'precision': precision})):
+        if engine == 'fixed':
+            from .fixed_engine import execute as execute_fixed, encode_prices, amountToStr
+            prices = strToDec(prices)
+            configs = [{**strToDec(config), 'prices': prices} for config in configs]
+            assert all(is_valid({**config, 'prices': []}) for config in configs) and all(ZERO < price for price in prices), 'invalid configuration'
+            encoded, scale = encode_prices(prices)
+            index = create_price_index(encoded)
+            return [amountToStr(execute_fixed(config, index, scale)) for config in configs]
+        return [decToStr(output) for output in execute_batch(strToDec(prices), [strToDec(config) for config in configs])]
@@ -0,0 +1,118 @@
+from json import loads, dumps
+from hashlib import sha256
+from decimal import Decimal, Context
+from os import path, makedirs, replace
+from threading import Lock
+from concurrent.futures import Future
+from collections import OrderedDict
+
+from . import OPTIONS, PRECISION, run_simulation, strToDec
+
+def canonicalize(obj: any) -> any:
+    if type(obj) is Decimal:
+        # a precision which fits every digit makes the normalization exact, e.g. '1.50' and '1.5' both become '1.5'
+        return str(obj.normalize(Context(prec=max(len(obj.as_tuple().digits), 1))))
+    if type(obj) is list:
+        return [canonicalize(val) for val in obj]
+    if type(obj) is dict:
+        return {key: canonicalize(val) for key, val in obj.items()}
+    raise Exception(f'illegal type {type(obj).__name__}')
+
+def calculate_key(config: dict) -> str:
+    config_carbon = {key: val for key, val in config.items() if key not in OPTIONS}
+    engine = config['engine'] if 'engine' in config else 'decimal'
+    canonical = {'engine': engine, 'config': canonicalize(strToDec(config_carbon))}
+    # the key of a simulation at the default precision is the same as it was before the precision was selectable
+    if 'precision' in config and int(config['precision']) != PRECISION:
+        canonical['precision'] = int(config['precision'])
+    if 'recording' in config and config['recording'] != 'dense':
+        canonical['recording'] = config['recording']
+    return sha256(dumps(canonical, sort_keys=True).encode()).hexdigest()
+
+class SimulationCache:
+    def __init__(self, max_bytes: int, directory: str = None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.size = 0
+        self.flights = {}
+        self.lock = Lock()
+        self.counters = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'waits': 0, 'evictions': 0}
+        if directory:
+            makedirs(directory, exist_ok=True)
+
+    def run_simulation(self, config: dict, profiler: any = None) -> dict:
+        # a simulation which writes a log file has a side effect, so it is never served from the cache
+        if 'logging' in config and config['logging']:
+            return run_simulation(config, profiler)
+        key = calculate_key(config)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.counters['hits'] += 1
+                return self.entries[key][0]
+            if key in self.flights:
+                self.counters['waits'] += 1
+                flight, owner = self.flights[key], False
+            else:
+                flight, owner = Future(), True
+                self.flights[key] = flight
+        if not owner:
+            return flight.result()
+        try:
+            output = self._load(key)
+            if output is None:
+                output = run_simulation(config, profiler)
+                self._store(key, output)
+            flight.set_result(output)
+            return output
+        except Exception as error:
+            flight.set_exception(error)
+            raise
+        finally:
+            with self.lock:
+                del self.flights[key]
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {**self.counters, 'entries': len(self.entries), 'bytes': self.size, 'max_bytes': self.max_bytes}
+
+    def _load(self, key: str) -> dict:
+        if self.directory and path.exists(self._file_name(key)):
+            fileDesc = open(self._file_name(key), 'r')
+            text = fileDesc.read()
+            fileDesc.close()
+            output = loads(text)
+            with self.lock:
+                self.counters['disk_hits'] += 1
+                self._insert(key, output, len(text))
+            return output
+        with self.lock:
+            self.counters['misses'] += 1
+        return None
+
+    def _store(self, key: str, output: dict) -> None:
+        text = dumps(output)
+        if self.directory:
+            # write via a temporary file, so that a concurrent reader never sees a partial entry
+            fileDesc = open(self._file_name(key) + '.tmp', 'w')
+            fileDesc.write(text)
+            fileDesc.close()
+            replace(self._file_name(key) + '.tmp', self._file_name(key))
+        with self.lock:
+            self._insert(key, output, len(text))
+
+    def _insert(self, key: str, output: dict, size: int) -> None:
+        if key in self.entries:
+            self.size -= self.entries.pop(key)[1]
+        if size > self.max_bytes:
+            return
+        while self.size + size > self.max_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.size -= evicted_size
+            self.counters['evictions'] += 1
+        self.entries[key] = (output, size)
+        self.size += size
+
+    def _file_name(self, key: str) -> str:
+        return path.join(self.directory, f'{key}.json')
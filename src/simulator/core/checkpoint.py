@@ -0,0 +1,72 @@
+from decimal import Decimal, localcontext
+
+from . import OPTIONS, ORDERS, BOUNDS, PRECISION, ZERO, get_context, check_dense_decimal, Order, Carbon, allocate, create_carbon, calculate_quotes, execute_steps, complete_recorder, strToDec, decToStr
+
+def create_checkpoint(carbon: Carbon, bid: Decimal, ask: Decimal, steps: int, precision: int) -> dict:
+    # every value is kept at full precision, since the output is only rounded once it is converted via `decToStr`
+    orders = [carbon.CASH, carbon.RISK]
+    return {
+        'steps': steps,
+        'precision': precision,
+        'curve_parameters': {
+            **{order.name: {'A': str(order.A), 'B': str(order.B), 'z': str(order.z)} for order in orders},
+            'inverse_fee': str(carbon.inverse_fee)
+        },
+        'initial_balances': {order.name: str(order.initial_y) for order in orders},
+        'balances': {order.name: str(order.y) for order in orders},
+        'fees': {order.name: str(order.fee) for order in orders},
+        'bounds': {key: str(getattr(carbon, key)) for key in BOUNDS},
+        'bid': str(bid),
+        'ask': str(ask)
+    }
+
+def restore_checkpoint(checkpoint: dict, length: int) -> (Carbon, Decimal, Decimal):
+    state = strToDec({key: val for key, val in checkpoint.items() if key not in ['steps', 'precision']})
+    orders = [
+        Order(
+            name,
+            state['curve_parameters'][name]['A'],
+            state['curve_parameters'][name]['B'],
+            state['curve_parameters'][name]['z'],
+            state['balances'][name],
+            state['fees'][name],
+            state['initial_balances'][name]
+        )
+        for name in ORDERS
+    ]
+    carbon = Carbon(*orders, state['curve_parameters']['inverse_fee'], *[state['bounds'][key] for key in BOUNDS])
+    allocate(carbon, length)
+    return carbon, state['bid'], state['ask']
+
+def start(config: dict) -> (dict, dict):
+    check_dense_decimal(config, 'checkpoints')
+    precision = int(config['precision']) if 'precision' in config else PRECISION
+    with localcontext(get_context(config)):
+        config_carbon = strToDec({key: val for key, val in config.items() if key not in OPTIONS})
+        carbon = create_carbon(config_carbon)
+        bid, ask = calculate_quotes(carbon)
+        bid, ask = execute_steps(carbon, config_carbon['prices'], bid, ask)
+        checkpoint = create_checkpoint(carbon, bid, ask, len(config_carbon['prices']), precision)
+        return decToStr(complete_recorder(carbon)), checkpoint
+
+def resume(checkpoint: dict, new_prices: list) -> (dict, dict):
+    # a simulation continues at the precision at which it started
+    precision = checkpoint['precision'] if 'precision' in checkpoint else PRECISION
+    with localcontext(get_context({'precision': precision})):
+        prices = strToDec(new_prices)
+        assert all(ZERO < price for price in prices), 'invalid configuration'
+        carbon, bid, ask = restore_checkpoint(checkpoint, len(prices))
+        bid, ask = execute_steps(carbon, prices, bid, ask)
+        checkpoint = create_checkpoint(carbon, bid, ask, checkpoint['steps'] + len(prices), precision)
+        return decToStr(complete_recorder(carbon)), checkpoint
+
+def append_output(output: dict, new_output: dict) -> dict:
+    combined = {}
+    for key, val in new_output.items():
+        if type(val) is list:
+            combined[key] = output[key] + val
+        elif key in ORDERS:
+            combined[key] = append_output(output[key], val)
+        else:
+            combined[key] = val
+    return combined
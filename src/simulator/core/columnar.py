@@ -0,0 +1,106 @@
+from sys import byteorder
+from json import loads, dumps
+from array import array
+from mmap import mmap, ACCESS_READ
+from struct import pack, unpack_from
+from decimal import Decimal, localcontext
+
+from numpy import frombuffer, ndarray
+
+from . import BOUNDS, get_context, simulate, decToStr, get_recording
+from .float_engine import formatFloat
+
+MAGIC = b'CSIM'
+VERSION = 1
+ALIGNMENT = 64
+
+# the range of a 64-bit integer, which holds a value of `i8` multiplied by 10 to the power of the decimals
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+COLUMNS = [
+    ('CASH', 'balance'),
+    ('CASH', 'fee'),
+    ('RISK', 'balance'),
+    ('RISK', 'fee'),
+    ('bid',),
+    ('ask',),
+    ('hodl_value',),
+    ('portfolio_cash',),
+    ('portfolio_risk',),
+    ('portfolio_value',),
+    ('portfolio_over_hodl',)
+]
+
+def encode_scalar(obj: any) -> any:
+    if type(obj) is dict:
+        return {key: encode_scalar(val) for key, val in obj.items()}
+    return decToStr(obj) if type(obj) is Decimal else formatFloat(obj)
+
+def encode_column(name: str, values: any, dtype: str, decimals: int) -> bytes:
+    if type(values) is ndarray:
+        values = values.tolist()
+    if dtype == 'f8':
+        column = array('d', map(float, values))
+    elif dtype == 'i8':
+        scale = Decimal(10) ** decimals
+        integers = [int((Decimal(value) * scale).to_integral_value()) for value in values]
+        for step, integer in enumerate(integers):
+            assert INT64_MIN <= integer <= INT64_MAX, f'{name} at step {step} is {values[step]}, which does not fit into i8 at {decimals} decimals; use fewer decimals or f8'
+        column = array('q', integers)
+    else:
+        raise Exception(f'illegal dtype {dtype}')
+    if byteorder == 'big':
+        column.byteswap()
+    return column.tobytes()
+
+def encode(recorder: dict, dtype: str = 'f8', decimals: int = 9) -> bytes:
+    columns = [encode_column('.'.join(path), recorder[path[0]][path[1]] if len(path) == 2 else recorder[path[0]], dtype, decimals) for path in COLUMNS]
+    length = len(columns[0]) // 8
+    header = {
+        'version': VERSION,
+        'dtype': dtype,
+        'decimals': decimals,
+        'length': length,
+        'columns': ['.'.join(path) for path in COLUMNS],
+        'scalars': {key: encode_scalar(recorder[key]) for key in BOUNDS + ['curve_parameters']}
+    }
+    # the header is padded, so that every column starts at an aligned offset of a memory-mapped file
+    header_bytes = dumps(header).encode()
+    header_bytes += b' ' * (-(len(MAGIC) + 4 + len(header_bytes)) % ALIGNMENT)
+    return MAGIC + pack('<I', len(header_bytes)) + header_bytes + b''.join(columns)
+
+def decode(buffer: any) -> dict:
+    assert bytes(buffer[:len(MAGIC)]) == MAGIC, 'illegal columnar simulation'
+    header_length, = unpack_from('<I', buffer, len(MAGIC))
+    header = loads(bytes(buffer[len(MAGIC) + 4:len(MAGIC) + 4 + header_length]))
+    assert header['version'] == VERSION, f'illegal columnar simulation version {header["version"]}'
+    offset = len(MAGIC) + 4 + header_length
+    dtype = '<f8' if header['dtype'] == 'f8' else '<i8'
+    output = {**header['scalars'], 'dtype': header['dtype'], 'decimals': header['decimals']}
+    for name in header['columns']:
+        # the columns are views on the buffer, which is not copied
+        column = frombuffer(buffer, dtype=dtype, count=header['length'], offset=offset)
+        offset += header['length'] * 8
+        path = name.split('.')
+        if len(path) == 2:
+            output.setdefault(path[0], {})[path[1]] = column
+        else:
+            output[path[0]] = column
+    return output
+
+def read(file_name: str) -> dict:
+    fileDesc = open(file_name, 'rb')
+    buffer = mmap(fileDesc.fileno(), 0, access=ACCESS_READ)
+    fileDesc.close()
+    return decode(buffer)
+
+def run_simulation_columnar(config: dict, dtype: str = 'f8', decimals: int = 9) -> bytes:
+    assert get_recording(config) == 'dense', f'{get_recording(config)} recording is not supported by the columnar output'
+    with localcontext(get_context(config)):
+        recorder = simulate(config)
+        if 'engine' in config and config['engine'] == 'fixed':
+            # the fixed engine records every value as an integer in the smallest unit
+            from .fixed_engine import amountToDec
+            recorder = amountToDec(recorder)
+        return encode(recorder, dtype, decimals)
@@ -0,0 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from . import run_simulation
+
+def run_simulations_concurrent(configs: list, max_workers: int = None) -> list:
+    # a simulation keeps its state and its decimal context local to its call, so any number of them may share a process
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run_simulation, configs))
@@ -0,0 +1,216 @@
+from math import isqrt, lcm
+from decimal import Decimal
+
+from . import ZERO, ORDERS, PriceIndex, Order, create_carbon, find_next_trade, search_next_trade
+
+CASH = 0
+RISK = 1
+
+# the contracts keep the square root of every rate in fixed point with 48 fractional bits,
+# and compress it into a 48-bit mantissa with a 6-bit exponent
+ONE = 1 << 48
+
+# every amount is kept in the smallest unit of a token with 18 decimals, in which the rates are the prices themselves
+DECIMALS = 18
+UNIT = 10 ** DECIMALS
+
+PPM_RESOLUTION = 1000000
+
+MAX_UINT256 = (1 << 256) - 1
+
+class FixedOrder:
+    __slots__ = ['y', 'z', 'A', 'B', 'fee']
+
+    def __init__(self, y: int, z: int, A: int, B: int):
+        self.y = y
+        self.z = z
+        self.A = A
+        self.B = B
+        self.fee = 0
+
+def mul_div_f(x: int, y: int, z: int) -> int:
+    return x * y // z
+
+def mul_div_c(x: int, y: int, z: int) -> int:
+    return -(-x * y // z)
+
+def min_factor(x: int, y: int) -> int:
+    return mul_div_c(x, y, MAX_UINT256)
+
+def encode_rate(value: Decimal) -> int:
+    data = int(value * ONE)
+    length = (data // ONE).bit_length()
+    return data >> length << length
+
+def encode_float(value: int) -> int:
+    exponent = (value // ONE).bit_length()
+    return ONE * exponent | value >> exponent
+
+def expand_rate(value: int) -> int:
+    return (value % ONE) << (value // ONE)
+
+def encode_amount(value: Decimal) -> int:
+    return int(value.scaleb(DECIMALS))
+
+def decode_amount(value: int) -> Decimal:
+    return Decimal(value).scaleb(-DECIMALS)
+
+def round_half_down(n: int, d: int) -> int:
+    # the integer nearest to n / d for a positive d, with ties rounded towards zero, as the output is rounded by `decToStr`
+    return -((d - 2 * n) // (2 * d)) if n >= 0 else (d + 2 * n) // (2 * d)
+
+def round_amounts(values: list, scale: int) -> list:
+    # the same as `round_half_down` over values which are not negative, without a call per value
+    if scale == 1:
+        return values
+    return [(2 * value + scale - 1) // (2 * scale) for value in values]
+
+def encode_prices(prices: list) -> (list, int):
+    # every price becomes an integer multiple of one over the common denominator of all of them, which is returned as their scale
+    assert all(ZERO < price for price in prices), 'invalid configuration'
+    ratios = [price.as_integer_ratio() for price in prices]
+    scale = lcm(*{d for n, d in ratios})
+    return [n * (scale // d) for n, d in ratios], scale
+
+def encode_bound(price: Decimal, n: int, d: int) -> int:
+    price_n, price_d = price.as_integer_ratio()
+    return round_half_down(price_n * n * UNIT, price_d * d)
+
+def encode_fee(network_fee: Decimal) -> int:
+    # the contracts keep the fee in whole ppm
+    return int((network_fee * PPM_RESOLUTION).to_integral_value())
+
+def encode_order(order: Order) -> FixedOrder:
+    L = encode_rate(order.B)
+    H = encode_rate(order.A + order.B)
+    return FixedOrder(encode_amount(order.y), encode_amount(order.z), expand_rate(encode_float(H - L)), expand_rate(encode_float(L)))
+
+def calculate_trade_source_amount(x: int, y: int, z: int, A: int, B: int) -> int:
+    # the input which buys `x` of an order, rounded up as by the contracts:
+    #        x * z ^ 2
+    # -------------------------------
+    # (A * y + B * z) * (A * y + B * z - A * x)
+    if A == 0:
+        assert B > 0, 'the order is disabled'
+        return mul_div_c(x, ONE * ONE, B * B)
+    temp1 = z * ONE
+    temp2 = y * A + z * B
+    temp3 = temp2 - x * A
+    factor = max(min_factor(temp1, temp1), min_factor(temp2, temp3))
+    temp4 = mul_div_c(temp1, temp1, factor)
+    temp5 = mul_div_f(temp2, temp3, factor)
+    return mul_div_c(x, temp4, temp5)
+
+def calculate_target_balance(order: FixedOrder, rate_n: int, rate_d: int) -> int:
+    # the balance at which the marginal rate of the order falls to the given one, or zero beyond its range
+    if order.A == 0:
+        return 0
+    root = isqrt(rate_n * ONE * ONE // rate_d)
+    return max(0, mul_div_c(order.z, root - order.B, order.A))
+
+def apply_trade(order_x: FixedOrder, order_y: FixedOrder, rate_n: int, rate_d: int, ppm: int) -> bool:
+    y = order_y.y
+    gross = y - min(y, calculate_target_balance(order_y, rate_n, rate_d))
+    # the arbitrageur trades by target amount, which the contracts gross up by the fee and take from the order
+    amount = mul_div_f(gross, PPM_RESOLUTION - ppm, PPM_RESOLUTION)
+    gross = mul_div_c(amount, PPM_RESOLUTION, PPM_RESOLUTION - ppm)
+    x = order_x.y
+    order_x.y += calculate_trade_source_amount(gross, y, order_y.z, order_y.A, order_y.B)
+    order_y.y -= gross
+    order_y.fee += gross - amount
+    if order_x.z < order_x.y:
+        order_x.z = order_x.y
+    # as with the `decimal` engine, a trade is filled only if it changes a balance
+    return (order_x.y, order_y.y) != (x, y)
+
+def calculate_quotes(orders: list, ppm: int, scale: int) -> (int, int, int, int):
+    # the bid and the ask as exact fractions, with the fee applied as by the `decimal` engine
+    CASH_root = orders[CASH].A * orders[CASH].y + orders[CASH].B * orders[CASH].z
+    RISK_root = orders[RISK].A * orders[RISK].y + orders[RISK].B * orders[RISK].z
+    bid_n, bid_d = (PPM_RESOLUTION - ppm) * CASH_root * CASH_root, PPM_RESOLUTION * (orders[CASH].z * ONE) ** 2
+    ask_n, ask_d = PPM_RESOLUTION * (orders[RISK].z * ONE) ** 2, (PPM_RESOLUTION - ppm) * RISK_root * RISK_root
+    # an encoded price is below the bid exactly if it is below its ceiling, and above the ask exactly if it is above its floor,
+    # and both quotes are recorded in the smallest unit
+    return -(-bid_n * scale // bid_d), ask_n * scale // ask_d, round_half_down(bid_n * UNIT, bid_d), round_half_down(ask_n * UNIT, ask_d)
+
+def record_steps(series: dict, orders: list, first: int, last: int, bid: int, ask: int) -> None:
+    for name, order in zip(ORDERS, orders):
+        series[f'{name} balance'][first:last] = [order.y] * (last - first)
+        series[f'{name} fee'][first:last] = [order.fee] * (last - first)
+    series['bid'][first:last] = [bid] * (last - first)
+    series['ask'][first:last] = [ask] * (last - first)
+
+def execute(config: dict, index: PriceIndex = None, scale: int = None) -> dict:
+    # every value of the output is an integer in the smallest unit, rounded as by `decToStr`, so that it is converted only once it is written;
+    # a batch passes an index over the prices which it has encoded once, along with their scale
+    ppm = encode_fee(config['network_fee'])
+    carbon = create_carbon({**config, 'network_fee': Decimal(ppm) / PPM_RESOLUTION, 'prices': []})
+    orders = [encode_order(order) for order in [carbon.CASH, carbon.RISK]]
+    prices, scale = encode_prices(config['prices']) if index is None else (index.prices, scale)
+    length = len(prices)
+    series = {key: [0] * length for key in ['CASH balance', 'RISK balance', 'CASH fee', 'RISK fee', 'bid', 'ask']}
+    initial_CASH, initial_RISK = [order.y for order in orders]
+    bid, ask, bid_amount, ask_amount = calculate_quotes(orders, ppm, scale)
+    step = 0
+    while step < length:
+        trade_step = find_next_trade(prices, step, bid, ask) if index is None else search_next_trade(index, step, bid, ask)
+        record_steps(series, orders, step, trade_step, bid_amount, ask_amount)
+        if trade_step < length:
+            price = prices[trade_step]
+            if price > ask:
+                apply_trade(orders[CASH], orders[RISK], scale * PPM_RESOLUTION, price * (PPM_RESOLUTION - ppm), ppm)
+            else:
+                apply_trade(orders[RISK], orders[CASH], price * PPM_RESOLUTION, scale * (PPM_RESOLUTION - ppm), ppm)
+            bid, ask, bid_amount, ask_amount = calculate_quotes(orders, ppm, scale)
+            record_steps(series, orders, trade_step, trade_step + 1, bid_amount, ask_amount)
+        step = trade_step + 1
+    # everything below depends only on the balances and the market price, in the smallest unit times the scale of the prices until it is rounded
+    hodl_value = [initial_CASH * scale + initial_RISK * price for price in prices]
+    portfolio_risk = [balance * price for balance, price in zip(series['RISK balance'], prices)]
+    portfolio_value = [balance * scale + risk for balance, risk in zip(series['CASH balance'], portfolio_risk)]
+    portfolio_over_hodl = [round_half_down(100 * UNIT * (value - hodl), hodl) for value, hodl in zip(portfolio_value, hodl_value)]
+    return {
+        'CASH': {'balance': series['CASH balance'], 'fee': series['CASH fee']},
+        'RISK': {'balance': series['RISK balance'], 'fee': series['RISK fee']},
+        'min_bid': encode_bound(config['low_range_low_price'], PPM_RESOLUTION - ppm, PPM_RESOLUTION),
+        'max_bid': encode_bound(config['low_range_high_price'], PPM_RESOLUTION - ppm, PPM_RESOLUTION),
+        'min_ask': encode_bound(config['high_range_low_price'], PPM_RESOLUTION, PPM_RESOLUTION - ppm),
+        'max_ask': encode_bound(config['high_range_high_price'], PPM_RESOLUTION, PPM_RESOLUTION - ppm),
+        'bid': series['bid'],
+        'ask': series['ask'],
+        'hodl_value': round_amounts(hodl_value, scale),
+        'portfolio_cash': series['CASH balance'],
+        'portfolio_risk': round_amounts(portfolio_risk, scale),
+        'portfolio_value': round_amounts(portfolio_value, scale),
+        'portfolio_over_hodl': portfolio_over_hodl,
+        'curve_parameters': {
+            **{name: {'A': round_half_down(order.A * UNIT, ONE), 'B': round_half_down(order.B * UNIT, ONE), 'z': order.z} for name, order in zip(ORDERS, orders)},
+            'inverse_fee': round_half_down((PPM_RESOLUTION - ppm) * UNIT, PPM_RESOLUTION)
+        }
+    }
+
+def formatAmount(value: int) -> str:
+    # the same text as `decToStr` gives for the amount
+    digits = str(abs(value)).rjust(DECIMALS + 1, '0')
+    text = f'{digits[:-DECIMALS]}.{digits[-DECIMALS:]}'.rstrip('0').rstrip('.')
+    return '-' + text if value < 0 else text
+
+def amountToStr(obj: any) -> any:
+    if type(obj) is int:
+        return formatAmount(obj)
+    if type(obj) is list:
+        # a balance, a fee or a quote remains the same over many steps, so every distinct amount is formatted once
+        texts = {}
+        return [texts[value] if value in texts else texts.setdefault(value, formatAmount(value)) for value in obj]
+    if type(obj) is dict:
+        return {key: amountToStr(val) for key, val in obj.items()}
+    raise Exception(f'illegal type {type(obj).__name__}')
+
+def amountToDec(obj: any) -> any:
+    if type(obj) is int:
+        return decode_amount(obj)
+    if type(obj) is list:
+        return [decode_amount(val) for val in obj]
+    if type(obj) is dict:
+        return {key: amountToDec(val) for key, val in obj.items()}
+    raise Exception(f'illegal type {type(obj).__name__}')
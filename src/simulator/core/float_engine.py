@@ -0,0 +1,238 @@
+from math import sqrt
+
+from numpy import inf, array, empty, zeros, sqrt as sqrt_array, maximum, errstate, float64, ndarray, format_float_positional
+
+from . import is_valid, create_price_index, search_next_trade
+
+CASH = 0
+RISK = 1
+
+# quotes which equal a range bound in exact arithmetic come out a few ulps off in float64,
+# so a market price is only treated as outside of the spread beyond this relative margin
+TOLERANCE = 1e-12
+
+def calculate_parameters(y: float, pa: float, pb: float, pm: float, n: int) -> (float, float, float, float):
+    H = sqrt(pa) ** n
+    L = sqrt(pb) ** n
+    M = sqrt(pm) ** n
+    A = H - L
+    B = L
+    z = y * (H - L) / (M - L) if M > L else y
+    w = z / (H * L)
+    return A, B, z, w
+
+def create_carbon(config: dict) -> dict:
+    # comparing every float price against a decimal is slow, so the prices are checked as a whole array
+    assert is_valid({**config, 'prices': []}) and (config['prices'] > 0).all(), 'invalid configuration'
+    inverse_fee = 1 - config['network_fee']
+    y_CASH = config['portfolio_cash_value']
+    y_RISK = config['portfolio_risk_value']
+    l_CASH, h_CASH, s_CASH = [config[f'low_range_{ param}_price'] for param in ['low', 'high', 'start']]
+    l_RISK, h_RISK, s_RISK = [config[f'high_range_{param}_price'] for param in ['low', 'high', 'start']]
+    A_CASH, B_CASH, z_CASH, w_CASH = calculate_parameters(y_CASH, h_CASH, l_CASH, s_CASH, +1)
+    A_RISK, B_RISK, z_RISK, w_RISK = calculate_parameters(y_RISK, l_RISK, h_RISK, s_RISK, -1)
+    if z_CASH == 0: z_CASH = w_RISK
+    if z_RISK == 0: z_RISK = w_CASH
+    return {
+        'A': [A_CASH, A_RISK],
+        'B': [B_CASH, B_RISK],
+        'z': [z_CASH, z_RISK],
+        'y': [y_CASH, y_RISK],
+        'fee': [0.0, 0.0],
+        'inverse_fee': inverse_fee,
+        'min_bid': l_CASH * inverse_fee,
+        'max_bid': h_CASH * inverse_fee,
+        'min_ask': l_RISK / inverse_fee,
+        'max_ask': h_RISK / inverse_fee
+    }
+
+# squares are spelled out as products, since python's pow and numpy's square may round differently
+
+def calculate_quotes(carbon: dict) -> (float, float):
+    inverse_fee = carbon['inverse_fee']
+    (A_CASH, A_RISK), (B_CASH, B_RISK), (z_CASH, z_RISK), (y_CASH, y_RISK) = [carbon[key] for key in ['A', 'B', 'z', 'y']]
+    bid_root = A_CASH * y_CASH + B_CASH * z_CASH
+    ask_root = A_RISK * y_RISK + B_RISK * z_RISK
+    bid = inverse_fee * (bid_root * bid_root) / (z_CASH * z_CASH)
+    ask = z_RISK * z_RISK / (inverse_fee * (ask_root * ask_root))
+    return bid, ask
+
+def apply_trade(carbon: dict, order_x: int, order_y: int, market_price: float, unit_price: float) -> bool:
+    inverse_fee = carbon['inverse_fee']
+    y, z, A, B = [carbon[key][order_y] for key in ['y', 'z', 'A', 'B']]
+    dy = z * (sqrt(market_price * inverse_fee) - B * unit_price * inverse_fee) / (A * unit_price * inverse_fee) - y if A > 0 else -y
+    if dy < -y:
+        dy = -y
+    root = A * y + B * z
+    dx = -dy * (z * z) / (A * dy * root + root * root)
+    balances = carbon['y'][order_x], carbon['y'][order_y]
+    carbon['y'][order_x] += dx
+    carbon['y'][order_y] += dy
+    carbon['fee'][order_y] -= dy * (1 - inverse_fee)
+    if carbon['z'][order_x] < carbon['y'][order_x]:
+        carbon['z'][order_x] = carbon['y'][order_x]
+    # as with the `decimal` engine, a trade is filled only if it changes a balance
+    return (carbon['y'][order_x], carbon['y'][order_y]) != balances
+
+def execute(config: dict) -> dict:
+    prices = config['prices']
+    carbon = create_carbon(config)
+    length = len(prices)
+    balance_CASH, balance_RISK, fee_CASH, fee_RISK, bids, asks = [[0.0] * length for _ in range(6)]
+    balances, fees = carbon['y'], carbon['fee']
+    initial_CASH, initial_RISK = balances
+    bid, ask = calculate_quotes(carbon)
+    for step, price in enumerate(prices.tolist()):
+        if price > ask * (1 + TOLERANCE):
+            apply_trade(carbon, CASH, RISK, price, price)
+            bid, ask = calculate_quotes(carbon)
+        elif price < bid * (1 - TOLERANCE):
+            apply_trade(carbon, RISK, CASH, price, 1.0)
+            bid, ask = calculate_quotes(carbon)
+        balance_CASH[step], balance_RISK[step] = balances
+        fee_CASH[step], fee_RISK[step] = fees
+        bids[step] = bid
+        asks[step] = ask
+    series = {
+        'CASH balance': array(balance_CASH),
+        'RISK balance': array(balance_RISK),
+        'CASH fee': array(fee_CASH),
+        'RISK fee': array(fee_RISK),
+        'bid': array(bids),
+        'ask': array(asks)
+    }
+    # everything below depends only on the balances and the market price, so it is computed over whole arrays
+    hodl_value = initial_CASH + initial_RISK * prices
+    portfolio_cash = series['CASH balance']
+    portfolio_risk = series['RISK balance'] * prices
+    portfolio_value = portfolio_cash + portfolio_risk
+    return {
+        'CASH': {'balance': series['CASH balance'], 'fee': series['CASH fee']},
+        'RISK': {'balance': series['RISK balance'], 'fee': series['RISK fee']},
+        'min_bid': carbon['min_bid'],
+        'max_bid': carbon['max_bid'],
+        'min_ask': carbon['min_ask'],
+        'max_ask': carbon['max_ask'],
+        'bid': series['bid'],
+        'ask': series['ask'],
+        'hodl_value': hodl_value,
+        'portfolio_cash': portfolio_cash,
+        'portfolio_risk': portfolio_risk,
+        'portfolio_value': portfolio_value,
+        'portfolio_over_hodl': 100 * (portfolio_value - hodl_value) / hodl_value,
+        'curve_parameters': {
+            'CASH': {'A': carbon['A'][CASH], 'B': carbon['B'][CASH], 'z': carbon['z'][CASH]},
+            'RISK': {'A': carbon['A'][RISK], 'B': carbon['B'][RISK], 'z': carbon['z'][RISK]},
+            'inverse_fee': carbon['inverse_fee']
+        }
+    }
+
+def create_state(carbons: list) -> dict:
+    # every state entry is indexed by order first and by strategy second, so that each step updates all strategies at once
+    state = {key: array([[carbon[key][order] for carbon in carbons] for order in [CASH, RISK]], dtype=float64) for key in ['A', 'B', 'z', 'y']}
+    state['fee'] = zeros((2, len(carbons)), dtype=float64)
+    state['inverse_fee'] = array([carbon['inverse_fee'] for carbon in carbons], dtype=float64)
+    return state
+
+def apply_trades(state: dict, indices: ndarray, order_x: int, order_y: int, market_price: float, unit_price: float) -> ndarray:
+    inverse_fee = state['inverse_fee'][indices]
+    y, z, A, B = [state[key][order_y, indices] for key in ['y', 'z', 'A', 'B']]
+    with errstate(divide='ignore', invalid='ignore'):
+        dy = z * (sqrt_array(market_price * inverse_fee) - B * unit_price * inverse_fee) / (A * unit_price * inverse_fee) - y
+    dy[A <= 0] = -y[A <= 0]
+    dy = maximum(dy, -y)
+    root = A * y + B * z
+    dx = -dy * (z * z) / (A * dy * root + root * root)
+    balances = state['y'][:, indices]
+    state['y'][order_x, indices] += dx
+    state['y'][order_y, indices] += dy
+    state['fee'][order_y, indices] -= dy * (1 - inverse_fee)
+    state['z'][order_x, indices] = maximum(state['z'][order_x, indices], state['y'][order_x, indices])
+    # whether the trade of every strategy is filled, i.e. changes a balance
+    return (state['y'][:, indices] != balances).any(axis=0)
+
+def record_batch_steps(series: dict, state: dict, first: int, last: int, bid: ndarray, ask: ndarray) -> None:
+    series['CASH balance'][first:last], series['RISK balance'][first:last] = state['y']
+    series['CASH fee'][first:last], series['RISK fee'][first:last] = state['fee']
+    series['bid'][first:last] = bid
+    series['ask'][first:last] = ask
+
+def execute_batch(prices: ndarray, configs: list) -> list:
+    assert (prices > 0).all(), 'invalid configuration'
+    carbons = [create_carbon({**config, 'prices': prices[:0]}) for config in configs]
+    state = create_state(carbons)
+    initial_y = state['y'].copy()
+    series = {key: empty((len(prices), len(carbons)), dtype=float64) for key in ['CASH balance', 'RISK balance', 'CASH fee', 'RISK fee', 'bid', 'ask']}
+    bid, ask = calculate_quotes(state)
+    # no strategy trades while the market price stays between the highest bid and the lowest ask, so the index finds the next trade of any of them
+    index = create_price_index(prices.tolist())
+    step = 0
+    while step < len(prices):
+        trade_step = search_next_trade(index, step, float((bid * (1 - TOLERANCE)).max(initial=0)), float((ask * (1 + TOLERANCE)).min(initial=inf)))
+        record_batch_steps(series, state, step, trade_step, bid, ask)
+        if trade_step < len(prices):
+            price = index.prices[trade_step]
+            buy = price > ask * (1 + TOLERANCE)
+            sell = (price < bid * (1 - TOLERANCE)) & ~buy
+            apply_trades(state, buy.nonzero()[0], CASH, RISK, price, price)
+            apply_trades(state, sell.nonzero()[0], RISK, CASH, price, 1.0)
+            bid, ask = calculate_quotes(state)
+            record_batch_steps(series, state, trade_step, trade_step + 1, bid, ask)
+        step = trade_step + 1
+    hodl_value = initial_y[CASH] + initial_y[RISK] * prices[:, None]
+    portfolio_risk = series['RISK balance'] * prices[:, None]
+    portfolio_value = series['CASH balance'] + portfolio_risk
+    portfolio_over_hodl = 100 * (portfolio_value - hodl_value) / hodl_value
+    return [
+        {
+            'CASH': {'balance': series['CASH balance'][:, i], 'fee': series['CASH fee'][:, i]},
+            'RISK': {'balance': series['RISK balance'][:, i], 'fee': series['RISK fee'][:, i]},
+            'min_bid': carbon['min_bid'],
+            'max_bid': carbon['max_bid'],
+            'min_ask': carbon['min_ask'],
+            'max_ask': carbon['max_ask'],
+            'bid': series['bid'][:, i],
+            'ask': series['ask'][:, i],
+            'hodl_value': hodl_value[:, i],
+            'portfolio_cash': series['CASH balance'][:, i],
+            'portfolio_risk': portfolio_risk[:, i],
+            'portfolio_value': portfolio_value[:, i],
+            'portfolio_over_hodl': portfolio_over_hodl[:, i],
+            'curve_parameters': {
+                'CASH': {key: float(state[key][CASH, i]) for key in ['A', 'B', 'z']},
+                'RISK': {key: float(state[key][RISK, i]) for key in ['A', 'B', 'z']},
+                'inverse_fee': carbon['inverse_fee']
+            }
+        }
+        for i, carbon in enumerate(carbons)
+    ]
+
+def strToFloat(obj: any) -> any:
+    if type(obj) is str:
+        return float(obj)
+    if type(obj) is list:
+        return array(obj, dtype=float64)
+    if type(obj) is dict:
+        return {key: strToFloat(val) for key, val in obj.items()}
+    raise Exception(f'illegal type {type(obj).__name__}')
+
+def formatFloat(val: float) -> str:
+    text = repr(val)
+    if 'e' in text:
+        return format_float_positional(val, trim='-')
+    return text[:-2] if text.endswith('.0') else text
+
+def floatToStr(obj: any) -> any:
+    if type(obj) is float:
+        return formatFloat(obj)
+    if type(obj) is ndarray:
+        return [formatFloat(val) for val in obj.tolist()]
+    if type(obj) is dict:
+        return {key: floatToStr(val) for key, val in obj.items()}
+    raise Exception(f'illegal type {type(obj).__name__}')
+
+def run_simulation(config: dict) -> dict:
+    return floatToStr(execute(strToFloat(config)))
+
+def run_simulations(prices: list, configs: list) -> list:
+    return [floatToStr(output) for output in execute_batch(strToFloat(prices), [strToFloat(config) for config in configs])]
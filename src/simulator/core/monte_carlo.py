@@ -0,0 +1,91 @@
+from os import cpu_count
+from concurrent.futures import ProcessPoolExecutor
+
+from numpy import zeros, log, diff, exp, cumsum, concatenate, percentile, float64, ndarray
+from numpy.random import SeedSequence, default_rng
+
+from . import OPTIONS
+from .float_engine import CASH, RISK, TOLERANCE, create_carbon, create_state, calculate_quotes, apply_trades, strToFloat
+
+MODELS = ['gbm', 'bootstrap']
+
+PERCENTILES = [5, 25, 50, 75, 95]
+
+def generate_paths(rng: any, model: dict, start_price: float, returns: ndarray, length: int, count: int) -> ndarray:
+    # every path starts at the first historical price and is indexed by step first and by path second, as in the batch
+    if model['model'] == 'gbm':
+        # the drift is that of the log price, which is the mean log return of the history already, so no convexity correction applies
+        drift = model['drift'] if 'drift' in model else returns.mean()
+        volatility = model['volatility'] if 'volatility' in model else returns.std()
+        steps = rng.normal(drift, volatility, (length - 1, count))
+    else:
+        steps = rng.choice(returns, (length - 1, count))
+    return start_price * exp(concatenate([zeros((1, count)), cumsum(steps, axis=0)]))
+
+def execute_paths(config: dict, paths: ndarray) -> dict:
+    carbon = create_carbon({**config, 'prices': paths[:0, 0]})
+    count = paths.shape[1]
+    # the same strategy is replicated over all paths, each of which trades at a market price of its own
+    state = create_state([carbon] * count)
+    initial_y = state['y'].copy()
+    trades = zeros(count, dtype=int)
+    bid, ask = calculate_quotes(state)
+    for prices in paths:
+        buy = prices > ask * (1 + TOLERANCE)
+        sell = (prices < bid * (1 - TOLERANCE)) & ~buy
+        if buy.any() or sell.any():
+            bought, sold = buy.nonzero()[0], sell.nonzero()[0]
+            trades[bought] += apply_trades(state, bought, CASH, RISK, prices[buy], prices[buy])
+            trades[sold] += apply_trades(state, sold, RISK, CASH, prices[sell], 1.0)
+            bid, ask = calculate_quotes(state)
+    final_prices = paths[-1]
+    hodl_value = initial_y[CASH] + initial_y[RISK] * final_prices
+    portfolio_value = state['y'][CASH] + state['y'][RISK] * final_prices
+    return {
+        'portfolio_over_hodl': 100 * (portfolio_value - hodl_value) / hodl_value,
+        'fee_value': state['fee'][CASH] + state['fee'][RISK] * final_prices,
+        'trades': trades.astype(float64),
+        'final_price': final_prices
+    }
+
+def run_chunk(config: dict, model: dict, start_price: float, returns: ndarray, length: int, count: int, seed: SeedSequence) -> dict:
+    return execute_paths(config, generate_paths(default_rng(seed), model, start_price, returns, length, count))
+
+def summarize(values: ndarray) -> dict:
+    return {
+        'mean': float(values.mean()),
+        'std': float(values.std()),
+        'min': float(values.min()),
+        **{f'p{n}': float(val) for n, val in zip(PERCENTILES, percentile(values, PERCENTILES))},
+        'max': float(values.max())
+    }
+
+def simulate_monte_carlo(config: dict, max_workers: int = None) -> dict:
+    model = {'model': 'gbm', 'paths': 1000, 'seed': 0, **(config['monte_carlo'] if 'monte_carlo' in config else {})}
+    assert model['model'] in MODELS, f'illegal model {model["model"]}'
+    assert 'logging' not in config or not config['logging'], 'logging is not supported by monte carlo simulations'
+    config = strToFloat({key: val for key, val in config.items() if key not in OPTIONS + ['monte_carlo']})
+    prices = config['prices']
+    assert len(prices) >= 2, 'the historical prices must hold at least two prices'
+    length = int(model['length']) if 'length' in model else len(prices)
+    count = int(model['paths'])
+    assert count >= 1, 'the number of paths must be at least one'
+    # the paths are split into chunks of a fixed size with a seed of their own, so that they do not depend on the number of workers
+    chunk_size = int(model['chunk_size']) if 'chunk_size' in model else 250
+    chunks = [min(chunk_size, count - start) for start in range(0, count, chunk_size)]
+    seeds = SeedSequence(int(model['seed'])).spawn(len(chunks))
+    args = [config, model, float(prices[0]), diff(log(prices)), length]
+    workers = min(max_workers or cpu_count() or 1, len(chunks))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(run_chunk, *[[arg] * len(chunks) for arg in args], chunks, seeds))
+    else:
+        results = [run_chunk(*args, chunk, seed) for chunk, seed in zip(chunks, seeds)]
+    metrics = {key: concatenate([result[key] for result in results]) for key in results[0]}
+    return {
+        'paths': count,
+        'length': length,
+        'model': model['model'],
+        **{key: summarize(values) for key, values in metrics.items()},
+        'probability_over_hodl': float((metrics['portfolio_over_hodl'] > 0).mean())
+    }
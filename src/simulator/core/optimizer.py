@@ -0,0 +1,141 @@
+from os import cpu_count
+from itertools import product
+from concurrent.futures import ProcessPoolExecutor
+
+from numpy import geomspace
+
+from . import OPTIONS, is_valid, run_simulation
+from .float_engine import execute_batch, strToFloat, formatFloat
+
+PARAMETERS = [f'{side}_range_{param}_price' for side in ['low', 'high'] for param in ['low', 'high', 'start']]
+
+# every objective is maximized, and the pareto front is taken over all of them
+OBJECTIVES = ['portfolio_over_hodl', 'fee_value', 'worst_portfolio_over_hodl']
+
+def round_price(value: float) -> float:
+    # the candidates are rounded, so that they read like prices and so that refinement revisits the same ones
+    return float(f'{value:.6g}')
+
+def generate_grid(bounds: dict, points: int) -> list:
+    # the prices are spaced evenly in logarithm, like the price ranges themselves
+    axes = [sorted({round_price(value) for value in geomspace(low, high, points).tolist()}) for low, high in bounds.values()]
+    return [dict(zip(bounds, values)) for values in product(*axes)]
+
+def refine_bounds(bounds: dict, center: dict, points: int) -> dict:
+    # the next grid spans one cell of the current grid on either side of its best candidate
+    refined = {}
+    for key, (low, high) in bounds.items():
+        ratio = (high / low) ** (1 / max(points - 1, 1))
+        refined[key] = [max(low, center[key] / ratio), min(high, center[key] * ratio)]
+    return refined
+
+def evaluate_batch(config: dict, candidates: list) -> list:
+    prices = config['prices']
+    outputs = execute_batch(prices, [{**config, **candidate} for candidate in candidates])
+    return [
+        {
+            'portfolio_over_hodl': float(output['portfolio_over_hodl'][-1]),
+            'fee_value': float(output['CASH']['fee'][-1] + output['RISK']['fee'][-1] * prices[-1]),
+            'worst_portfolio_over_hodl': float(output['portfolio_over_hodl'].min())
+        }
+        for output in outputs
+    ]
+
+class Search:
+    def __init__(self, config: dict, executor: ProcessPoolExecutor, batch_size: int):
+        self.config = config
+        self.executor = executor
+        self.batch_size = batch_size
+        self.results = {}
+        self.rejected = 0
+
+    def evaluate(self, candidates: list) -> None:
+        # every candidate is checked before it is submitted, and is evaluated once however often the search visits it
+        valid = {}
+        for candidate in candidates:
+            key = tuple(candidate.items())
+            if key in self.results or key in valid:
+                continue
+            if is_valid({**self.config, **candidate, 'prices': []}):
+                valid[key] = candidate
+            else:
+                self.results[key] = None
+                self.rejected += 1
+        valid = list(valid.values())
+        batches = [valid[n:n + self.batch_size] for n in range(0, len(valid), self.batch_size)]
+        if self.executor:
+            metrics = self.executor.map(evaluate_batch, [self.config] * len(batches), batches)
+        else:
+            metrics = [evaluate_batch(self.config, batch) for batch in batches]
+        for batch, batch_metrics in zip(batches, metrics):
+            for candidate, candidate_metrics in zip(batch, batch_metrics):
+                self.results[tuple(candidate.items())] = candidate_metrics
+
+    def best(self, objective: str) -> (dict, dict):
+        evaluated = [(key, val) for key, val in self.results.items() if val is not None]
+        assert evaluated, 'no candidate within the bounds is a valid configuration'
+        key, val = max(evaluated, key=lambda item: item[1][objective])
+        return dict(key), val
+
+def pareto_front(results: dict) -> list:
+    # in descending order of all objectives, a candidate can only be dominated by one before it, and then by one on the front
+    candidates = sorted(
+        [(dict(key), val) for key, val in results.items() if val is not None],
+        key=lambda item: [item[1][objective] for objective in OBJECTIVES],
+        reverse=True
+    )
+    front = []
+    for candidate, metrics in candidates:
+        if not any(all(other[objective] >= metrics[objective] for objective in OBJECTIVES) for _, other in front):
+            front.append((candidate, metrics))
+    return front
+
+def optimize(config: dict, max_workers: int = None) -> dict:
+    settings = {'objective': 'portfolio_over_hodl', 'grid': 5, 'levels': 3, 'batch_size': 250, **config['optimizer']}
+    objective = settings['objective']
+    assert objective in OBJECTIVES, f'illegal objective {objective}'
+    assert 'logging' not in config or not config['logging'], 'logging is not supported by optimizations'
+    bounds = {key: [float(low), float(high)] for key, (low, high) in settings['bounds'].items()}
+    assert bounds and all(key in PARAMETERS for key in bounds), f'the bounds must be given for some of {PARAMETERS}'
+    assert all(0 < low <= high for low, high in bounds.values()), 'every bound must be a positive range'
+    points = int(settings['grid'])
+    assert 2 <= points, 'the grid must hold at least two points per parameter'
+    config_search = strToFloat({key: val for key, val in config.items() if key not in OPTIONS + ['optimizer'] + list(bounds)})
+    assert (config_search['prices'] > 0).all(), 'invalid configuration'
+    workers = max_workers or cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        search = Search(config_search, executor, int(settings['batch_size']))
+        # coarse to fine: every level evaluates a grid around the best candidate of the previous one
+        level_bounds = bounds
+        for level in range(int(settings['levels'])):
+            search.evaluate(generate_grid(level_bounds, points))
+            center, _ = search.best(objective)
+            level_bounds = refine_bounds(level_bounds, center, points)
+        # local refinement: a compass search from the best candidate, whose step shrinks whenever no neighbor improves
+        center, metrics = search.best(objective)
+        ratio = max((high / low) ** (1 / (points - 1)) for low, high in level_bounds.values())
+        while ratio > 1.0001:
+            neighbors = []
+            for key, (low, high) in bounds.items():
+                for value in [center[key] / ratio, center[key] * ratio]:
+                    if low <= value <= high:
+                        neighbors.append({**center, key: round_price(value)})
+            search.evaluate(neighbors)
+            candidate, candidate_metrics = search.best(objective)
+            if candidate_metrics[objective] > metrics[objective]:
+                center, metrics = candidate, candidate_metrics
+            else:
+                ratio = ratio ** 0.5
+    finally:
+        if executor:
+            executor.shutdown()
+    winner = {key: formatFloat(val) for key, val in center.items()}
+    return {
+        'objective': objective,
+        'evaluated': sum(val is not None for val in search.results.values()),
+        'rejected': search.rejected,
+        'winner': {**winner, **metrics},
+        'pareto_front': [{**{key: formatFloat(val) for key, val in candidate.items()}, **val} for candidate, val in pareto_front(search.results)],
+        'simulation': run_simulation({key: val for key, val in config.items() if key != 'optimizer'} | winner)
+    }
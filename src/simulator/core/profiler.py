@@ -0,0 +1,70 @@
+from os import environ
+from sys import stderr
+from json import dumps
+from time import perf_counter
+
+ENVIRONMENT_VARIABLE = 'SIMULATOR_PROFILE'
+
+# python's decimal module does not count its operations, so they are estimated from the arithmetic of `calculate_quotes`,
+# of `apply_trade` with its root, and of recording a dense step, regardless of cached roots, drained orders and skipped steps
+ESTIMATED_DECIMAL_OPERATIONS = {'quotes': 14, 'trades': 32, 'steps': 7}
+
+def create_profiler(config: dict):
+    # the attribute is either an object or a boolean, and either way it takes precedence over the environment variable
+    if 'profiling' not in config:
+        output_file_name = environ.get(ENVIRONMENT_VARIABLE)
+    elif type(config['profiling']) is dict:
+        output_file_name = config['profiling'].get('output_file_name', '-')
+    else:
+        output_file_name = '-' if config['profiling'] else None
+    if not output_file_name:
+        return FakeProfiler()
+    return Profiler(output_file_name)
+
+class Profiler:
+    def __init__(self, output_file_name: str):
+        self.output_file_name = output_file_name
+        self.phases = {}
+        self.counters = {'steps': 0, 'trades': 0, 'out_of_range': 0, 'quotes': 0}
+
+    def phase(self, name: str, function: callable, *args, **kwargs) -> any:
+        start = perf_counter()
+        result = function(*args, **kwargs)
+        self.add(name, perf_counter() - start)
+        return result
+
+    def add(self, name: str, elapsed: float):
+        self.phases[name] = self.phases.get(name, 0) + elapsed
+
+    def count(self, name: str, value: int = 1):
+        self.counters[name] += value
+
+    def quotes(self, function: callable, *args) -> any:
+        self.counters['quotes'] += 1
+        return self.phase('quotes', function, *args)
+
+    def trade(self, details: dict) -> dict:
+        if details and details['filled']:
+            self.counters['trades'] += 1
+            self.counters['out_of_range'] += details['out_of_range']['before']
+        return details
+
+    def report(self):
+        counters = {**self.counters, 'estimated_decimal_operations': sum(self.counters[key] * val for key, val in ESTIMATED_DECIMAL_OPERATIONS.items())}
+        line = dumps({'profile': {'phases': self.phases, 'counters': counters}})
+        if self.output_file_name == '-':
+            stderr.write(line + '\n')
+            stderr.flush()
+        else:
+            # a sidecar file collects one report per simulation, e.g. of every request served by a worker
+            fileDesc = open(self.output_file_name, 'a')
+            fileDesc.write(line + '\n')
+            fileDesc.close()
+
+class FakeProfiler:
+    def phase(self, name: str, function: callable, *args, **kwargs) -> any: return function(*args, **kwargs)
+    def add(*_): pass
+    def count(*_): pass
+    def quotes(self, function: callable, *args) -> any: return function(*args)
+    def trade(self, details: dict) -> dict: return details
+    def report(*_): pass
@@ -0,0 +1,168 @@
+from datetime import datetime
+
+HEADERS = ('Attribute', 'Value', 'Note')
+BUFFER_SIZE = 1 << 20
+
+def parse_date(date: str) -> datetime:
+    # iso 8601, as produced by moment's `toISOString`, whose trailing 'Z' older python versions do not accept
+    return datetime.fromisoformat(date[:-1] + '+00:00' if date.endswith('Z') else date)
+
+class RealLogger:
+    def __init__(self, config: dict):
+        cash_token_symbol = config['cash_token_symbol']
+        risk_token_symbol = config['risk_token_symbol']
+
+        self.messages = {
+            'can_be_sold': f'- {risk_token_symbol} can be sold for {{}} {cash_token_symbol} per unit\n',
+            'can_be_bought': f'- {risk_token_symbol} can be bought for {{}} {cash_token_symbol} per unit\n',
+            'can_still_be_sold': f'- {risk_token_symbol} can still be sold for {{}} {cash_token_symbol} per unit\n',
+            'can_still_be_bought': f'- {risk_token_symbol} can still be bought for {{}} {cash_token_symbol} per unit\n',
+            'cannot_be_sold': f'- {risk_token_symbol} cannot be sold; strategy has run out of {cash_token_symbol}\n',
+            'cannot_be_bought': f'- {risk_token_symbol} cannot be bought; strategy has run out of {cash_token_symbol}\n',
+            'total_sold': f'A total of {{}} {risk_token_symbol} was sold for a total of {{}} {cash_token_symbol}.\n',
+            'total_bought': f'A total of {{}} {risk_token_symbol} was bought for a total of {{}} {cash_token_symbol}.\n',
+            'market_price': f'The market price of {risk_token_symbol} is {{}} {cash_token_symbol} per unit.\n',
+            'within_the_spread': f'Since this price is within the spread, the arbitrageur will not attempt to trade {risk_token_symbol}.\n',
+            'arbitrageur_attempt': f'Since this price is not within the spread, the arbitrageur will attempt to {{}} {risk_token_symbol}.\n'
+        }
+
+        self.attributes = [
+            f'{risk_token_symbol} balance',
+            f'{cash_token_symbol} balance',
+            f'{risk_token_symbol} protocol-owned fees',
+            f'{cash_token_symbol} protocol-owned fees',
+            f'{risk_token_symbol} market price',
+            f'{cash_token_symbol} portfolio value',
+            f'{cash_token_symbol} hodl value',
+            'portfolio versus hodl'
+        ]
+
+        self.notes = [
+            f'The liquidity of {risk_token_symbol}',
+            f'The liquidity of {cash_token_symbol}',
+            f'Not part of the user portfolio performance calculation',
+            f'Not part of the user portfolio performance calculation',
+            f'The market price of {risk_token_symbol} in {cash_token_symbol} units at the current step of the simulation',
+            f'`user-owned {cash_token_symbol}` + `user-owned {risk_token_symbol}` * `market price of {risk_token_symbol}`',
+            f'The user portfolio value in {cash_token_symbol} units if they did not create this strategy',
+            '(`portfolio value` - `hodl value`) / `hodl value` * 100'
+        ]
+
+        self.dates = [parse_date(date) for date in config['dates']]
+        self.output_file = open(config['output_file_name'], 'w', buffering=BUFFER_SIZE)
+
+        # the attribute and note columns never change, so their part of the summary table is laid out once
+        self.layouts = {}
+        if all(cell.isascii() and cell.isprintable() and cell == cell.strip() for cell in self.attributes + self.notes):
+            attribute_width = max(len(HEADERS[0]) + 2, *[len(attribute) for attribute in self.attributes])
+            note_width = max(len(HEADERS[2]) + 2, *[len(note) for note in self.notes])
+            self.widths = (attribute_width, note_width)
+            self.prefixes = [f'| {attribute.ljust(attribute_width)} | ' for attribute in self.attributes]
+            self.suffixes = [f' | {note.ljust(note_width)} |\n' for note in self.notes]
+        else:
+            self.widths = None
+
+    def update_before(self, carbon: any, step: int, price: any, bid: any, ask: any):
+        time_delta = self.dates[step] - self.dates[0]
+        years, days = divmod(time_delta.days, 365)
+        months, days = divmod(days, 30)
+        weeks, days = divmod(days, 7)
+        hours, seconds = divmod(time_delta.seconds, 3600)
+        minutes = seconds // 60
+
+        components = [
+            (years, 'year'),
+            (months, 'month'),
+            (weeks, 'week'),
+            (days, 'day'),
+            (hours, 'hour'),
+            (minutes, 'minute')
+        ]
+
+        duration = ', '.join(f'{value} {unit}s' if value > 1 else f'{value} {unit}' for value, unit in components if value > 0)
+
+        self.output_file.write(f'Step: {step}\n')
+        self.output_file.write(f'Date: {self.dates[step]}\n')
+        self.output_file.write(f'Duration: {duration if duration else "none"}\n\n')
+
+        self.output_file.write('Marginal price quotes before arbitrage:\n')
+        self._update_quotes(carbon, bid, ask)
+
+        self.output_file.write(self.messages['market_price'].format(f'{price:.6f}'))
+        if price > ask:
+            self.output_file.write(self.messages['arbitrageur_attempt'].format('buy'))
+        elif price < bid:
+            self.output_file.write(self.messages['arbitrageur_attempt'].format('sell'))
+        else:
+            self.output_file.write(self.messages['within_the_spread'])
+
+    def update_after(self, carbon: any, details: dict, price: any, bid: any, ask: any):
+        if details:
+            if details['out_of_range']['before']:
+                self.output_file.write('The market equilibrium point is outside of the carbon range.\n')
+                if details['out_of_range']['after']:
+                    self.output_file.write('Since the market price remains outside of the carbon range, no trade was performed.\n')
+            else:
+                self.output_file.write('There is enough liquidity to equilibrate carbon to the market price.\n')
+            action, risk, cash = [details[key] for key in ['action', 'RISK', 'CASH']]
+            self.output_file.write(self.messages[f'total_{action}'].format(f'{risk:.6f}', f'{cash:.6f}'))
+            self.output_file.write('\nMarginal price quotes after arbitrage:\n')
+            self._update_quotes(carbon, bid, ask)
+        else:
+            self.output_file.write('Since carbon is at equilibrium with the market, no trade was performed.\n\n')
+
+        portfolio_over_hodl = carbon.portfolio_over_hodl[carbon.steps - 1]
+        sign = '+' if portfolio_over_hodl > 0 else '-' if portfolio_over_hodl < 0 else ' '
+
+        values = [
+            f"{carbon.RISK.y:.18f}",
+            f"{carbon.CASH.y:.18f}",
+            f"{carbon.RISK.fee:.18f}",
+            f"{carbon.CASH.fee:.18f}",
+            f"{price:.18f}",
+            f"{carbon.portfolio_value[carbon.steps - 1]:.18f}",
+            f"{carbon.hodl_value[carbon.steps - 1]:.18f}",
+            f"{sign}{portfolio_over_hodl:.17f}%"
+        ]
+
+        self.output_file.write(self._summarize([value.strip() for value in values]))
+
+    def close(self):
+        self.output_file.close()
+
+    def _summarize(self, values: list) -> str:
+        if self.widths is None:
+            from tabulate import tabulate
+            summary = tabulate(
+                list(zip(self.attributes, values, self.notes)),
+                headers=HEADERS,
+                tablefmt='outline',
+                colalign=('left', 'right', 'left')
+            )
+            return f'{summary}\n\n'
+
+        value_width = max(len(HEADERS[1]) + 2, *[len(value) for value in values])
+        if value_width not in self.layouts:
+            widths = (self.widths[0], value_width, self.widths[1])
+            border = '+' + '+'.join('-' * (width + 2) for width in widths) + '+\n'
+            self.layouts[value_width] = (
+                border +
+                f'| {HEADERS[0].ljust(widths[0])} | {HEADERS[1].rjust(widths[1])} | {HEADERS[2].ljust(widths[2])} |\n' +
+                '+' + '+'.join('=' * (width + 2) for width in widths) + '+\n',
+                border + '\n'
+            )
+        header, footer = self.layouts[value_width]
+        rows = ''.join(prefix + value.rjust(value_width) + suffix for prefix, value, suffix in zip(self.prefixes, values, self.suffixes))
+        return header + rows + footer
+
+    def _update_quotes(self, carbon: any, bid: any, ask: any):
+        if carbon.CASH.y == 0:
+            self.output_file.write(self.messages['cannot_be_sold'])
+            self.output_file.write(self.messages['can_still_be_bought'].format(f'{ask:.6f}'))
+        elif carbon.RISK.y == 0:
+            self.output_file.write(self.messages['cannot_be_bought'])
+            self.output_file.write(self.messages['can_still_be_sold'].format(f'{bid:.6f}'))
+        else:
+            self.output_file.write(self.messages['can_be_sold'].format(f'{bid:.6f}'))
+            self.output_file.write(self.messages['can_be_bought'].format(f'{ask:.6f}'))
+        self.output_file.write('\n')
@@ -0,0 +1,110 @@
+from bisect import bisect_right
+from decimal import localcontext
+
+from numpy import inf, array, zeros
+
+from . import OPTIONS, Order, Carbon, get_context, is_valid, create_carbon, create_price_table, create_price_index, search_next_trade, calculate_quotes, calculate_portfolio, calculate_portfolio_over_hodl, equilibrate_protocol, strToDec, decToStr
+
+def copy_carbon(carbon: Carbon) -> Carbon:
+    orders = [Order(order.name, order.A, order.B, order.z, order.y, order.fee, order.initial_y) for order in [carbon.CASH, carbon.RISK]]
+    return Carbon(*orders, carbon.inverse_fee, carbon.min_bid, carbon.max_bid, carbon.min_ask, carbon.max_ask)
+
+def summarize(start: int, trades: int, balances: list, fees: list, portfolio_over_hodl: any) -> dict:
+    return {
+        'start': start,
+        'trades': trades,
+        'CASH': {'balance': balances[0], 'fee': fees[0]},
+        'RISK': {'balance': balances[1], 'fee': fees[1]},
+        'portfolio_over_hodl': portfolio_over_hodl
+    }
+
+def execute_rolling(config_carbon: dict, starts: list) -> list:
+    # the strategy starts in the same state at every start, so the prices, their table, their roots and their index are shared by all starts
+    assert is_valid(config_carbon), 'invalid configuration'
+    prices = config_carbon['prices']
+    assert all(0 <= start < len(prices) for start in starts), 'every start must be a step of the prices'
+    initial = create_carbon({**config_carbon, 'prices': []})
+    table = create_price_table(initial, prices)
+    index = create_price_index(prices)
+    initial_bid, initial_ask = calculate_quotes(initial)
+    last = table.indices[-1]
+    # every start holds the initial state until its first trade, after which it depends on the step of that trade only,
+    # so the starts whose first trade is at the same step share the rest of their simulation
+    finals = {}
+    summaries = []
+    for start in starts:
+        first = search_next_trade(index, start, initial_bid, initial_ask)
+        if first not in finals:
+            # nothing is recorded, and every trade is found through the index
+            carbon = copy_carbon(initial)
+            bid, ask = initial_bid, initial_ask
+            trades = 0
+            step = first
+            while step < len(prices):
+                trades += equilibrate_protocol(carbon, table, table.indices[step], bid, ask)['filled']
+                bid, ask = calculate_quotes(carbon)
+                step = search_next_trade(index, step + 1, bid, ask)
+            portfolio_value = calculate_portfolio(carbon, table.prices[last])[2]
+            portfolio_over_hodl = calculate_portfolio_over_hodl(table.hodl_values[last], portfolio_value)
+            finals[first] = trades, [carbon.CASH.y, carbon.RISK.y], [carbon.CASH.fee, carbon.RISK.fee], portfolio_over_hodl
+        summaries.append(summarize(start, *finals[first]))
+    return summaries
+
+def execute_rolling_float(config: dict, starts: list) -> list:
+    from .float_engine import CASH, RISK, TOLERANCE, create_carbon as create_carbon_float, create_state, calculate_quotes as calculate_quotes_float, apply_trades
+
+    prices = config['prices']
+    assert all(0 <= start < len(prices) for start in starts), 'every start must be a step of the prices'
+    carbon = create_carbon_float(config)
+    # every start is a strategy of the state, which only trades from its own step on
+    state = create_state([carbon] * len(starts))
+    initial_y = state['y'].copy()
+    start_steps = array(starts, dtype=int)
+    activations = sorted(set(starts))
+    trades = zeros(len(starts), dtype=int)
+    bid, ask = calculate_quotes_float(state)
+    index = create_price_index(prices.tolist())
+    step = activations[0] if activations else len(prices)
+    while step < len(prices):
+        active = start_steps <= step
+        # the search stops at the next start as well, whose strategy may trade at its first step
+        position = bisect_right(activations, step)
+        next_start = activations[position] if position < len(activations) else len(prices)
+        trade_step = min(next_start, search_next_trade(index, step, float((bid * (1 - TOLERANCE))[active].max(initial=0)), float((ask * (1 + TOLERANCE))[active].min(initial=inf))))
+        if trade_step == len(prices):
+            break
+        price = index.prices[trade_step]
+        active = start_steps <= trade_step
+        buy = active & (price > ask * (1 + TOLERANCE))
+        sell = active & (price < bid * (1 - TOLERANCE)) & ~buy
+        if buy.any() or sell.any():
+            bought, sold = buy.nonzero()[0], sell.nonzero()[0]
+            trades[bought] += apply_trades(state, bought, CASH, RISK, price, price)
+            trades[sold] += apply_trades(state, sold, RISK, CASH, price, 1.0)
+            bid, ask = calculate_quotes_float(state)
+        step = trade_step + 1
+    final_price = prices[-1]
+    hodl_value = initial_y[CASH] + initial_y[RISK] * final_price
+    portfolio_value = state['y'][CASH] + state['y'][RISK] * final_price
+    portfolio_over_hodl = 100 * (portfolio_value - hodl_value) / hodl_value
+    return [
+        summarize(start, int(trades[i]), [float(state['y'][CASH, i]), float(state['y'][RISK, i])], [float(state['fee'][CASH, i]), float(state['fee'][RISK, i])], float(portfolio_over_hodl[i]))
+        for i, start in enumerate(starts)
+    ]
+
+def run_rolling(config: dict, starts: list) -> list:
+    # the start and the number of trades of every summary are no decimals
+    config_carbon = {key: val for key, val in config.items() if key not in OPTIONS + ['starts']}
+    # every start of the decimal engine is simulated on its own, which takes about as long as a full simulation,
+    # so the float engine, which advances all starts together, is the default for thousands of them
+    engine = config['engine'] if 'engine' in config else 'float'
+    assert 'logging' not in config or not config['logging'], 'logging is not supported by rolling starts'
+    if engine == 'float':
+        from .float_engine import strToFloat, floatToStr
+        summaries = execute_rolling_float(strToFloat(config_carbon), starts)
+        return [{key: val if key in ['start', 'trades'] else floatToStr(val) for key, val in summary.items()} for summary in summaries]
+    if engine != 'decimal':
+        raise Exception(f'illegal engine {engine}')
+    with localcontext(get_context(config)):
+        summaries = execute_rolling(strToDec(config_carbon), starts)
+        return [{key: val if key in ['start', 'trades'] else decToStr(val) for key, val in summary.items()} for summary in summaries]
@@ -0,0 +1,51 @@
+from json import loads, dumps
+from time import perf_counter
+from os import path, remove
+from socketserver import ThreadingUnixStreamServer, StreamRequestHandler
+
+from . import run_simulation
+from .cache import SimulationCache
+from .profiler import create_profiler
+
+def handle_request(line: str, cache: SimulationCache = None) -> str:
+    start = perf_counter()
+    try:
+        request = loads(line)
+    except ValueError as error:
+        return dumps({'id': None, 'error': f'malformed request: {error}'})
+    parse_time = perf_counter() - start
+    request_id = request.get('id') if type(request) is dict else None
+    try:
+        if 'stats' in request:
+            return dumps({'id': request_id, 'stats': cache.stats() if cache else None})
+        profiler = create_profiler(request['config'])
+        profiler.add('parse', parse_time)
+        if cache:
+            output = cache.run_simulation(request['config'], profiler)
+        else:
+            output = run_simulation(request['config'], profiler)
+        reply = profiler.phase('serialize', dumps, {'id': request_id, 'output': output})
+        profiler.report()
+        return reply
+    except Exception as error:
+        return dumps({'id': request_id, 'error': f'{type(error).__name__}: {error}'})
+
+def serve_stream(input_file, output_file, cache: SimulationCache = None) -> None:
+    for line in input_file:
+        if line.strip():
+            output_file.write(handle_request(line, cache) + '\n')
+            output_file.flush()
+
+def serve_socket(socket_path: str, cache: SimulationCache = None) -> None:
+    class Handler(StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if line.strip():
+                    self.wfile.write((handle_request(line.decode(), cache) + '\n').encode())
+                    self.wfile.flush()
+
+    if path.exists(socket_path):
+        remove(socket_path)
+    with ThreadingUnixStreamServer(socket_path, Handler) as server:
+        server.daemon_threads = True
+        server.serve_forever()
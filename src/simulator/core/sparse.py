@@ -0,0 +1,68 @@
+from decimal import Decimal
+
+from . import ORDERS, BOUNDS, FakeProfiler, Order, Carbon, is_valid, allocate, create_carbon, create_price_table, calculate_quotes, equilibrate_protocol, find_next_trade, record_steps, record_step, get_curve_parameters, complete_recorder, decToStr
+
+def record_state(state: dict, carbon: Carbon, bid: Decimal, ask: Decimal) -> None:
+    for order in [carbon.CASH, carbon.RISK]:
+        state[order.name]['balance'].append(order.y)
+        state[order.name]['fee'].append(order.fee)
+    state['bid'].append(bid)
+    state['ask'].append(ask)
+
+def execute_sparse(config_carbon: dict, profiler: any = FakeProfiler()) -> dict:
+    # only the state before the first step and after every trade which changes it is recorded, since it holds until the next trade
+    assert is_valid(config_carbon), 'invalid configuration'
+    prices = config_carbon['prices']
+    carbon = create_carbon({**config_carbon, 'prices': []})
+    table = profiler.phase('prices', create_price_table, carbon, prices)
+    bid, ask = profiler.quotes(calculate_quotes, carbon)
+    initial = {order: {'balance': [], 'fee': []} for order in ORDERS} | {'bid': [], 'ask': []}
+    record_state(initial, carbon, bid, ask)
+    trades = {'step': [], 'action': []} | {order: {'balance': [], 'fee': []} for order in ORDERS} | {'bid': [], 'ask': []}
+    profiler.count('steps', len(prices))
+    step = find_next_trade(prices, 0, bid, ask)
+    while step < len(prices):
+        details = profiler.trade(equilibrate_protocol(carbon, table, table.indices[step], bid, ask))
+        bid, ask = profiler.quotes(calculate_quotes, carbon)
+        # a trade which is not filled leaves the state as it is, so there is nothing to record
+        if details['filled']:
+            trades['step'].append(step)
+            trades['action'].append(details['action'])
+            record_state(trades, carbon, bid, ask)
+        step = find_next_trade(prices, step + 1, bid, ask)
+    return {
+        'steps': len(prices),
+        'initial': {key: val[0] if key in ['bid', 'ask'] else {name: values[0] for name, values in val.items()} for key, val in initial.items()},
+        'trades': trades,
+        **{key: getattr(carbon, key) for key in BOUNDS},
+        'curve_parameters': get_curve_parameters(carbon)
+    }
+
+def expand(sparse: dict, prices: list) -> dict:
+    # every series is rebuilt by the same arithmetic as that of `execute_events`, so the dense output is identical to its own
+    assert len(prices) == sparse['steps'], 'the prices do not belong to the simulation'
+    initial, trades, parameters = sparse['initial'], sparse['trades'], sparse['curve_parameters']
+    orders = [
+        Order(name, parameters[name]['A'], parameters[name]['B'], parameters[name]['z'], initial[name]['balance'], initial[name]['fee'], initial[name]['balance'])
+        for name in ORDERS
+    ]
+    carbon = Carbon(*orders, parameters['inverse_fee'], *[sparse[key] for key in BOUNDS])
+    allocate(carbon, len(prices))
+    table = create_price_table(carbon, prices)
+    bid, ask = initial['bid'], initial['ask']
+    start = 0
+    for n, step in enumerate(trades['step']):
+        record_steps(carbon, table, start, step, bid, ask)
+        for order in orders:
+            order.y = trades[order.name]['balance'][n]
+            order.fee = trades[order.name]['fee'][n]
+        bid, ask = trades['bid'][n], trades['ask'][n]
+        record_step(carbon, table, table.indices[step], bid, ask)
+        start = step + 1
+    record_steps(carbon, table, start, len(prices), bid, ask)
+    return complete_recorder(carbon)
+
+def sparseToStr(sparse: dict) -> dict:
+    # the number of steps, the steps of the trades and their actions are no decimals
+    trades = {key: val if key in ['step', 'action'] else decToStr(val) for key, val in sparse['trades'].items()}
+    return {key: val if key == 'steps' else trades if key == 'trades' else decToStr(val) for key, val in sparse.items()}
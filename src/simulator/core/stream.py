@@ -0,0 +1,51 @@
+from json import dumps
+from decimal import Decimal, localcontext
+
+from . import OPTIONS, BOUNDS, get_context, check_dense_decimal, execute_iter, strToDec, decToStr
+
+def run_simulation_iter(config: dict) -> iter:
+    check_dense_decimal(config, 'streams')
+    config_carbon = {key: val for key, val in config.items() if key not in OPTIONS + ['prices']}
+    prices = (Decimal(price) for price in config['prices'])
+    context = get_context(config)
+    records = execute_iter({**strToDec(config_carbon), 'prices': prices})
+    while True:
+        # the local context must not span a yield, or else it would leak into the consumer between steps
+        with localcontext(context):
+            record = next(records, None)
+            if record is None:
+                return
+            record = decToStr(record)
+        yield record
+
+def stream_simulation(config: dict, output_file, output_format: str, chunk_size: int) -> None:
+    if output_format not in ['ndjson', 'json']:
+        raise Exception(f'illegal format {output_format}')
+    chunk = []
+    for index, record in enumerate(run_simulation_iter(config)):
+        if output_format == 'ndjson':
+            chunk.append(dumps(record) + '\n')
+        else:
+            chunk.append(('[\n' if index == 0 else ',\n') + dumps(record))
+        if len(chunk) == chunk_size:
+            output_file.write(''.join(chunk))
+            output_file.flush()
+            chunk = []
+    if output_format == 'json':
+        chunk.append('\n]\n')
+    output_file.write(''.join(chunk))
+    output_file.flush()
+
+def collect_records(records: iter) -> dict:
+    output = {}
+    for record in records:
+        for key, val in record.items():
+            if key in ['CASH', 'RISK']:
+                output.setdefault(key, {'balance': [], 'fee': []})
+                output[key]['balance'].append(val['balance'])
+                output[key]['fee'].append(val['fee'])
+            elif key in BOUNDS + ['curve_parameters']:
+                output[key] = val
+            else:
+                output.setdefault(key, []).append(val)
+    return output
@@ -0,0 +1,89 @@
+from decimal import Decimal
+
+from . import BOUNDS, ZERO, FakeProfiler, Carbon, is_valid, create_carbon, create_price_table, calculate_quotes, calculate_hodl_value, calculate_portfolio, calculate_portfolio_over_hodl, equilibrate_protocol, get_curve_parameters, decToStr
+
+class Drawdown:
+    __slots__ = ['peak', 'trough', 'maximum']
+
+    def __init__(self):
+        self.peak = None
+        self.trough = None
+        self.maximum = ZERO
+
+    def update(self, portfolio_value: Decimal) -> bool:
+        if self.peak is None or portfolio_value > self.peak:
+            self.complete()
+            self.peak = self.trough = portfolio_value
+            return True
+        if portfolio_value < self.trough:
+            self.trough = portfolio_value
+        return False
+
+    def complete(self) -> None:
+        # the drawdown from a peak is the largest at the lowest value before the next peak
+        if self.peak is not None and self.peak > ZERO:
+            self.maximum = max(self.maximum, 100 * (self.peak - self.trough) / self.peak)
+
+def calculate_portfolio_value(carbon: Carbon, market_price: Decimal) -> Decimal:
+    return calculate_portfolio(carbon, market_price)[2]
+
+def execute_summary(config_carbon: dict, profiler: any = FakeProfiler()) -> dict:
+    # the analytics are updated at every step with a constant amount of state, and nothing else is recorded
+    assert is_valid(config_carbon), 'invalid configuration'
+    prices = config_carbon['prices']
+    assert prices, 'a summary needs at least one price'
+    carbon = create_carbon({**config_carbon, 'prices': []})
+    bid, ask = profiler.quotes(calculate_quotes, carbon)
+    trades = 0
+    volume = {'CASH': ZERO, 'RISK': ZERO}
+    steps_in_range = 0
+    drawdown = Drawdown()
+    # the portfolio value rises with the market price while the balances are constant, so between two trades it is only calculated at a price
+    # above the highest one since the last trade, which may make a new peak, or below the lowest one since then and since the last peak, which may make a new trough
+    highest = lowest = None
+    profiler.count('steps', len(prices))
+    for price in prices:
+        if price > ask or price < bid:
+            # the table holds the current price only, as in `execute_iter`
+            details = profiler.trade(equilibrate_protocol(carbon, create_price_table(carbon, [price]), 0, bid, ask))
+            bid, ask = profiler.quotes(calculate_quotes, carbon)
+            trades += details['filled']
+            volume['CASH'] += details['CASH']
+            volume['RISK'] += details['RISK']
+            drawdown.update(calculate_portfolio_value(carbon, price))
+            highest = lowest = price
+        elif highest is None or price > highest:
+            if drawdown.update(calculate_portfolio_value(carbon, price)):
+                lowest = price
+            highest = price
+        elif price < lowest:
+            drawdown.update(calculate_portfolio_value(carbon, price))
+            lowest = price
+        if carbon.min_bid <= price <= carbon.max_ask:
+            steps_in_range += 1
+    drawdown.complete()
+    hodl_value = calculate_hodl_value(carbon, prices[-1])
+    portfolio_cash, portfolio_risk, portfolio_value = calculate_portfolio(carbon, prices[-1])
+    return {
+        'steps': len(prices),
+        'trades': trades,
+        'volume': volume,
+        'max_drawdown': drawdown.maximum,
+        'time_in_range': 100 * Decimal(steps_in_range) / len(prices),
+        'final': {
+            **{order.name: {'balance': order.y, 'fee': order.fee} for order in [carbon.CASH, carbon.RISK]},
+            'bid': bid,
+            'ask': ask,
+            'hodl_value': hodl_value,
+            'portfolio_cash': portfolio_cash,
+            'portfolio_risk': portfolio_risk,
+            'portfolio_value': portfolio_value,
+            'portfolio_over_hodl': calculate_portfolio_over_hodl(hodl_value, portfolio_value)
+        },
+        **{key: getattr(carbon, key) for key in BOUNDS},
+        'curve_parameters': get_curve_parameters(carbon)
+    }
+
+def summaryToStr(summary: dict) -> dict:
+    # the number of steps and the number of trades are no decimals
+    return {key: val if key in ['steps', 'trades'] else decToStr(val) for key, val in summary.items()}
@@ -0,0 +1,117 @@
+from json import loads, dumps
+from os import cpu_count
+from time import perf_counter
+from signal import signal, setitimer, SIGALRM, ITIMER_REAL
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from . import run_simulation
+
+def raise_timeout(*_):
+    raise TimeoutError('the simulation exceeded its time limit')
+
+def initialize_worker() -> None:
+    # every task of a worker runs on its main thread, where an interval timer can interrupt it
+    signal(SIGALRM, raise_timeout)
+
+def parse_task(index: int, line: str) -> (any, dict):
+    request = loads(line)
+    # a line is either a bare configuration, identified by its line number, or a request as served by the worker
+    if type(request) is dict and 'config' in request:
+        return request.get('id', index), request['config']
+    return index, request
+
+def run_task(index: int, line: str, timeout: float) -> (str, str, int):
+    task_id = index
+    try:
+        task_id, config = parse_task(index, line)
+        if timeout:
+            setitimer(ITIMER_REAL, timeout)
+        try:
+            output = run_simulation(config)
+        finally:
+            if timeout:
+                setitimer(ITIMER_REAL, 0)
+        return dumps({'id': task_id, 'output': output}), 'succeeded', len(config['prices'])
+    except TimeoutError as error:
+        return dumps({'id': task_id, 'error': f'TimeoutError: {error}'}), 'timed_out', 0
+    except Exception as error:
+        return dumps({'id': task_id, 'error': f'{type(error).__name__}: {error}'}), 'failed', 0
+
+def run_chunk(chunk: list, timeout: float) -> list:
+    return [run_task(index, line, timeout) for index, line in chunk]
+
+def read_chunks(manifest, chunk_size: int) -> iter:
+    chunk = []
+    for index, line in enumerate(manifest):
+        if line.strip():
+            chunk.append((index, line))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+def fail_chunk(chunk: list, error: Exception) -> list:
+    results = []
+    for index, line in chunk:
+        try:
+            task_id = parse_task(index, line)[0]
+        except Exception:
+            task_id = index
+        results.append((dumps({'id': task_id, 'error': f'{type(error).__name__}: {error}'}), 'failed', 0))
+    return results
+
+def run_sweep(manifest, output_file, max_workers: int = None, timeout: float = None, chunk_size: int = 1, queue_depth: int = 2) -> dict:
+    max_workers = max_workers or cpu_count()
+    summary = {'succeeded': 0, 'failed': 0, 'timed_out': 0, 'steps': 0, 'failed_ids': []}
+    pending = {}
+    start = perf_counter()
+
+    def create_executor() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=max_workers, initializer=initialize_worker)
+
+    def collect(futures: set) -> None:
+        for future in futures:
+            chunk = pending.pop(future)
+            try:
+                results = future.result()
+            except BrokenProcessPool as error:
+                # a worker which dies takes its whole chunk with it, while the pool is replaced for the remaining ones
+                results = fail_chunk(chunk, error)
+            for reply, status, steps in results:
+                output_file.write(reply + '\n')
+                summary[status] += 1
+                summary['steps'] += steps
+                if status != 'succeeded':
+                    summary['failed_ids'].append(loads(reply)['id'])
+        output_file.flush()
+
+    executor = create_executor()
+    try:
+        # the manifest is read lazily, and only a bounded number of chunks is in flight at a time
+        for chunk in read_chunks(manifest, chunk_size):
+            try:
+                future = executor.submit(run_chunk, chunk, timeout)
+            except BrokenProcessPool:
+                executor.shutdown(wait=False)
+                executor = create_executor()
+                future = executor.submit(run_chunk, chunk, timeout)
+            pending[future] = chunk
+            if len(pending) >= max_workers * queue_depth:
+                collect(wait(pending, return_when=FIRST_COMPLETED).done)
+        while pending:
+            collect(wait(pending, return_when=FIRST_COMPLETED).done)
+    finally:
+        executor.shutdown()
+
+    seconds = perf_counter() - start
+    simulations = summary['succeeded'] + summary['failed'] + summary['timed_out']
+    return {
+        **summary,
+        'simulations': simulations,
+        'workers': max_workers,
+        'seconds': seconds,
+        'simulations_per_second': simulations / seconds,
+        'steps_per_second': summary['steps'] / seconds
+    }
@@ -0,0 +1,185 @@
+from json import dumps
+from math import exp
+from time import perf_counter
+from random import Random
+from decimal import Decimal
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from core import is_valid, run_simulation, strToDec
+from accuracy import flatten
+
+# the keys which an engine may leave out of its output, e.g. the legacy engine has no `curve_parameters`
+OPTIONAL_KEYS = ['curve_parameters']
+
+def run_core_org(config: dict) -> dict:
+    from core_org import run_simulation as run_simulation_org
+    return run_simulation_org(config)
+
+def run_float(config: dict) -> dict:
+    return run_simulation({**config, 'engine': 'float'})
+
+def run_fixed(config: dict) -> dict:
+    return run_simulation({**config, 'engine': 'fixed'})
+
+# every engine is compared against the decimal engine, either exactly or within a tolerance relative to the magnitude of each series
+ENGINES = {
+    'core_org': (run_core_org, None),
+    'float': (run_float, 1e-9),
+    'fixed': (run_fixed, 1e-6)
+}
+
+def format_number(value: float) -> str:
+    return f'{Decimal(f"{value:.6g}"):f}'
+
+def generate_config(rng: Random, max_length: int, tie_rate: float) -> dict:
+    while True:
+        price = 10 ** rng.uniform(-3, 4)
+        low_range_low_price = price * rng.uniform(0.5, 1)
+        low_range_high_price = low_range_low_price * rng.choice([1, rng.uniform(1, 1.5)])
+        high_range_low_price = price * rng.uniform(1, 1.5)
+        high_range_high_price = high_range_low_price * rng.choice([1, rng.uniform(1, 1.5)])
+        config = {
+            'portfolio_cash_value': format_number(rng.choice([0, rng.uniform(1, 10000)])),
+            'portfolio_risk_value': format_number(rng.choice([0, rng.uniform(1, 10000)])),
+            'low_range_low_price': format_number(low_range_low_price),
+            'low_range_high_price': format_number(low_range_high_price),
+            'low_range_start_price': format_number(rng.choice([low_range_high_price, rng.uniform(low_range_low_price, low_range_high_price)])),
+            'high_range_low_price': format_number(high_range_low_price),
+            'high_range_high_price': format_number(high_range_high_price),
+            'high_range_start_price': format_number(rng.choice([high_range_low_price, rng.uniform(high_range_low_price, high_range_high_price)])),
+            # the fees are whole ppm, as on chain
+            'network_fee': format_number(rng.choice([0, 500, 1000, 2000, 10000, rng.randint(0, 50000)]) / 1000000)
+        }
+        # the bounds of both ranges are market prices as well now and then, since a price at a quote is where engines tend to differ
+        bounds = [float(config[key]) for key in ['low_range_low_price', 'low_range_high_price', 'high_range_low_price', 'high_range_high_price']]
+        volatility = rng.choice([0.001, 0.01, 0.05])
+        prices = []
+        for n in range(rng.randint(1, max_length)):
+            price = rng.choice(bounds) if rng.random() < tie_rate else price * exp(rng.gauss(0, volatility))
+            prices.append(format_number(price))
+        config['prices'] = prices
+        if is_valid(strToDec(config)):
+            return config
+
+def compare(expected: dict, actual: dict, tolerance: float) -> (str, dict):
+    missing = [key for key in expected if key not in actual and key not in OPTIONAL_KEYS]
+    if missing or any(key not in expected for key in actual):
+        return f'the output keys differ: {sorted(expected)} versus {sorted(actual)}', {}
+    expected = dict(flatten({key: val for key, val in expected.items() if key in actual}))
+    actual = dict(flatten(actual))
+    deviations = {}
+    mismatch = None
+    for key in expected:
+        if len(expected[key]) != len(actual[key]):
+            return f'{key} has {len(actual[key])} values instead of {len(expected[key])}', {}
+        scale = max(abs(float(x)) for x in expected[key])
+        for step, (x, y) in enumerate(zip(expected[key], actual[key])):
+            x_float, y_float = float(x), float(y)
+            deviation = abs(y_float - x_float) / abs(x_float) if x_float else abs(y_float)
+            deviations[key] = max(deviations.get(key, 0), deviation)
+            if tolerance is None:
+                equal = x == y
+            else:
+                equal = abs(y_float - x_float) <= tolerance * max(abs(x_float), scale)
+            if not equal and mismatch is None:
+                mismatch = f'{key} at step {step} is {y} instead of {x}'
+    return mismatch, deviations
+
+def check_config(config: dict, engine: str) -> (str, dict):
+    run, tolerance = ENGINES[engine]
+    expected = run_simulation(config)
+    try:
+        actual = run(config)
+    except Exception as error:
+        return f'{type(error).__name__}: {error}', {}
+    return compare(expected, actual, tolerance)
+
+def check_case(seed: int, engines: list, max_length: int, tie_rate: float) -> dict:
+    config = generate_config(Random(seed), max_length, tie_rate)
+    results = {engine: check_config(config, engine) for engine in engines}
+    return {
+        'seed': seed,
+        'steps': len(config['prices']),
+        'mismatches': {engine: mismatch for engine, (mismatch, _) in results.items() if mismatch},
+        'deviations': {engine: deviations for engine, (_, deviations) in results.items()}
+    }
+
+def simplify_values(value: str) -> iter:
+    yield '0'
+    for digits in range(1, 6):
+        yield format_number(float(f'{float(value):.{digits}g}'))
+
+def shrink(config: dict, engine: str, max_checks: int = 2000) -> dict:
+    checks = 0
+
+    def fails(candidate: dict) -> bool:
+        nonlocal checks
+        if candidate == config or checks >= max_checks or not candidate['prices'] or not is_valid(strToDec(candidate)):
+            return False
+        checks += 1
+        return check_config(candidate, engine)[0] is not None
+
+    # the prices are removed in ever smaller chunks, and then every other value is rounded, until neither makes progress
+    shrunk = True
+    while shrunk and checks < max_checks:
+        shrunk = False
+        size = len(config['prices'])
+        while size >= 1:
+            start = 0
+            while start < len(config['prices']):
+                candidate = {**config, 'prices': config['prices'][:start] + config['prices'][start + size:]}
+                if fails(candidate):
+                    config, shrunk = candidate, True
+                else:
+                    start += size
+            size //= 2
+        for key in [key for key in config if key != 'prices']:
+            for value in simplify_values(config[key]):
+                if len(value) < len(config[key]) and fails({**config, key: value}):
+                    config, shrunk = {**config, key: value}, True
+                    break
+        for n in range(len(config['prices'])):
+            for value in simplify_values(config['prices'][n]):
+                candidate = {**config, 'prices': config['prices'][:n] + [value] + config['prices'][n + 1:]}
+                if len(value) < len(config['prices'][n]) and fails(candidate):
+                    config, shrunk = candidate, True
+                    break
+    return config
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('-n', '--count', type=int, default=1000, help='the number of random configurations')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='the seed of the first configuration')
+    parser.add_argument('-l', '--max-length', type=int, default=100, help='the maximum number of prices of a configuration')
+    parser.add_argument('-t', '--tie-rate', type=float, default=0.05, help='the probability of a price at a bound of either range')
+    parser.add_argument('-e', '--engines', choices=list(ENGINES), nargs='+', default=list(ENGINES))
+    parser.add_argument('-w', '--max-workers', type=int, default=None, help='the number of worker processes, by default the number of cores')
+    parser.add_argument('-k', '--max-shrinks', type=int, default=3, help='the number of mismatches to shrink per engine')
+    args = parser.parse_args()
+
+    start = perf_counter()
+    steps = 0
+    mismatches = {engine: [] for engine in args.engines}
+    deviations = {engine: {} for engine in args.engines}
+    seeds = range(args.seed, args.seed + args.count)
+    with ProcessPoolExecutor(max_workers=args.max_workers) as executor:
+        for result in executor.map(check_case, seeds, [args.engines] * args.count, [args.max_length] * args.count, [args.tie_rate] * args.count, chunksize=16):
+            steps += result['steps']
+            for engine, mismatch in result['mismatches'].items():
+                mismatches[engine].append((result['seed'], mismatch))
+            for engine, worst in result['deviations'].items():
+                for key, val in worst.items():
+                    deviations[engine][key] = max(deviations[engine].get(key, 0), val)
+    seconds = perf_counter() - start
+
+    print(f'configurations: {args.count}, steps: {steps}, {seconds:.1f}s, {args.count / seconds:.1f} configurations and {steps / seconds:.0f} steps per second')
+    for engine in args.engines:
+        print(f'{engine}: {len(mismatches[engine])} mismatches')
+        for key, val in sorted(deviations[engine].items(), key=lambda item: -item[1]):
+            print(f'- worst deviation of {key}: {val:.3e}')
+        for seed, mismatch in mismatches[engine][:args.max_shrinks]:
+            config = shrink(generate_config(Random(seed), args.max_length, args.tie_rate), engine)
+            print(f'- seed {seed}: {mismatch}')
+            print(f'  minimal configuration: {dumps(config)}')
+            print(f'  minimal mismatch: {check_config(config, engine)[0]}')
+    exit(1 if any(mismatches.values()) else 0)
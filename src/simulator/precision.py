@@ -0,0 +1,44 @@
+from json import loads, dumps
+from random import Random
+from decimal import localcontext
+from argparse import ArgumentParser
+from core import PRECISION, OPTIONS, FakeProfiler, create_context, simulate_in_context, decToStr
+from test import generate_configs
+from oracle import generate_config
+
+def load_corpus(config_file_names: list, tie_count: int) -> list:
+    corpus = [dict(config) for config in generate_configs()]
+    # the output depends on the precision mostly where a price is at a quote, so random configurations with prices at the bounds of their ranges are included
+    corpus += [generate_config(Random(seed), 100, 0.2) for seed in range(tie_count)]
+    for config_file_name in config_file_names:
+        fileDesc = open(config_file_name, 'r')
+        config = loads(fileDesc.read())
+        fileDesc.close()
+        corpus.append({key: val for key, val in config.items() if key not in OPTIONS})
+    return corpus
+
+def run_at_precision(config: dict, precision: int) -> str:
+    # the output must be reproduced byte for byte, including the sign of a value which rounds to zero
+    with localcontext(create_context(precision)):
+        return dumps(decToStr(simulate_in_context(config, FakeProfiler())))
+
+def find_min_precision(corpus: list) -> (int, dict):
+    # every precision is verified from the reference down, so that all of those above the result reproduce the output as well
+    expected = [run_at_precision(config, PRECISION) for config in corpus]
+    for precision in range(PRECISION - 1, 0, -1):
+        for config, output in zip(corpus, expected):
+            if run_at_precision(config, precision) != output:
+                return precision + 1, config
+        print(f'precision {precision} reproduces the output of {len(corpus)} configurations', flush=True)
+    return 1, None
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('config_file_names', nargs='*', help='configuration files to add to the corpus of the test grid')
+    parser.add_argument('-t', '--ties', type=int, default=300, help='the number of random configurations with prices at the bounds of their ranges to add to the corpus')
+    args = parser.parse_args()
+    min_precision, config = find_min_precision(load_corpus(args.config_file_names, args.ties))
+    print(f'minimum precision: {min_precision}')
+    if config:
+        print(f'first configuration which is not reproduced at precision {min_precision - 1}:')
+        print(dumps({key: val for key, val in config.items() if key != 'prices'}, indent=4))
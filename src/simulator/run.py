@@ -1,21 +1,100 @@
+from sys import stdin, stdout
 from json import loads, dumps
-from core import run_simulation
+from time import perf_counter
+from core import run_simulation, check_dense_decimal, PRECISION
+from core.profiler import create_profiler
 from argparse import ArgumentParser
 
 parser = ArgumentParser()
 parser.add_argument('-c', '--config-file-name', default='example_config.json')
 parser.add_argument('-o', '--output-file-name', default='example_output.json')
+parser.add_argument('-s', '--serve', action='store_true', help='serve newline-delimited json requests until the input is closed')
+parser.add_argument('-u', '--socket', default=None, help='serve on this unix socket instead of stdin/stdout')
+parser.add_argument('-m', '--cache-bytes', type=int, default=0, help='cache identical requests in up to this many bytes of memory when serving')
+parser.add_argument('-d', '--cache-directory', default=None, help='cache identical requests in this directory as well when serving')
+parser.add_argument('-k', '--checkpoint-file-name', default=None, help='write the engine state after the last step into this file')
+parser.add_argument('-r', '--resume', action='store_true', help='continue from the checkpoint file with the configuration\'s `prices`')
+parser.add_argument('-t', '--stream', choices=['ndjson', 'json'], default=None, help='write every step as soon as it is computed, to stdout if the output file name is `-`')
+parser.add_argument('-n', '--chunk-size', type=int, default=1000, help='the number of records written at a time when streaming')
+parser.add_argument('-f', '--output-format', choices=['json', 'f8', 'i8'], default='json', help='write json, or binary columns of float64 or of fixed-point int64 values')
+parser.add_argument('-p', '--decimals', type=int, default=9, help='the number of decimals of fixed-point int64 values')
+parser.add_argument('-b', '--batch', action='store_true', help='simulate every strategy in the configuration\'s `configs` against its shared `prices`')
+parser.add_argument('-x', '--monte-carlo', action='store_true', help='simulate the strategy over synthetic price paths modeled on the configuration\'s `prices`')
+parser.add_argument('-g', '--rolling', action='store_true', help='summarize the strategy from every step in the configuration\'s `starts` to the last one')
+parser.add_argument('-z', '--optimize', action='store_true', help='search the range prices within the configuration\'s `optimizer` bounds')
+parser.add_argument('-w', '--max-workers', type=int, default=None, help='the number of worker processes of a monte carlo simulation or an optimization, by default the number of cores')
 
 args = parser.parse_args()
 config_file_name = args.config_file_name
 output_file_name = args.output_file_name
 
+if args.serve:
+    from core.server import serve_stream, serve_socket
+    from core.cache import SimulationCache
+    cache = SimulationCache(args.cache_bytes, args.cache_directory) if args.cache_bytes or args.cache_directory else None
+    if args.socket:
+        serve_socket(args.socket, cache)
+    else:
+        serve_stream(stdin, stdout, cache)
+    exit(0)
+
+start = perf_counter()
 fileDesc = open(config_file_name, 'r')
 config = loads(fileDesc.read())
 fileDesc.close()
+profiler = create_profiler(config)
+profiler.add('parse', perf_counter() - start)
+
+if args.stream:
+    from core.stream import stream_simulation
+    fileDesc = stdout if output_file_name == '-' else open(output_file_name, 'w')
+    stream_simulation(config, fileDesc, args.stream, args.chunk_size)
+    if fileDesc is not stdout:
+        fileDesc.close()
+    exit(0)
+
+if args.output_format != 'json':
+    from core.columnar import run_simulation_columnar
+    fileDesc = open(output_file_name, 'wb')
+    fileDesc.write(run_simulation_columnar(config, args.output_format, args.decimals))
+    fileDesc.close()
+    exit(0)
 
-output = run_simulation(config)
+if args.batch:
+    from core.batch import run_simulations
+    output = run_simulations(
+        config['prices'],
+        config['configs'],
+        config['engine'] if 'engine' in config else 'decimal',
+        int(config['precision']) if 'precision' in config else PRECISION
+    )
+elif args.monte_carlo:
+    from core.monte_carlo import simulate_monte_carlo
+    output = simulate_monte_carlo(config, args.max_workers)
+elif args.rolling:
+    from core.rolling import run_rolling
+    output = run_rolling(config, config['starts'])
+elif args.optimize:
+    from core.optimizer import optimize
+    output = optimize(config, args.max_workers)
+elif args.checkpoint_file_name:
+    from core.checkpoint import start, resume
+    if args.resume:
+        # only the prices of the configuration are simulated, but an option which would not apply is rejected as in `start`
+        check_dense_decimal(config, 'checkpoints')
+        fileDesc = open(args.checkpoint_file_name, 'r')
+        checkpoint = loads(fileDesc.read())
+        fileDesc.close()
+        output, checkpoint = resume(checkpoint, config['prices'])
+    else:
+        output, checkpoint = start(config)
+    fileDesc = open(args.checkpoint_file_name, 'w')
+    fileDesc.write(dumps(checkpoint, indent=4))
+    fileDesc.close()
+else:
+    output = run_simulation(config, profiler)
 
 fileDesc = open(output_file_name, 'w')
-fileDesc.write(dumps(output, indent=4))
+fileDesc.write(profiler.phase('serialize', dumps, output, indent=4))
 fileDesc.close()
+profiler.report()
@@ -0,0 +1,64 @@
+from os import path
+from json import loads, dumps
+from decimal import DefaultContext, ROUND_UP
+from tempfile import TemporaryDirectory
+from argparse import ArgumentParser
+from core import MIN_PRECISION, run_simulation
+from core.concurrency import run_simulations_concurrent
+from test import generate_configs
+
+def generate_variants(folder: str, count: int) -> list:
+    fileDesc = open(path.join(path.dirname(path.abspath(__file__)), 'example_config.json'), 'r')
+    example = loads(fileDesc.read())
+    fileDesc.close()
+    configs = [dict(config) for config in generate_configs()]
+    variants = []
+    for n in range(count):
+        config = dict(configs[n * 7919 % len(configs)])
+        if n % 5 == 1:
+            config['engine'] = 'float'
+        elif n % 5 == 2:
+            config['precision'] = MIN_PRECISION + n % 7
+        elif n % 5 == 3:
+            config['logging'] = {
+                'output_file_name': path.join(folder, f'{n}.log'),
+                'cash_token_symbol': 'CASH',
+                'risk_token_symbol': 'RISK',
+                'dates': [f'2022-01-{day + 1:02d}T00:00:00' for day in range(len(config['prices']))]
+            }
+        elif n % 50 == 4:
+            config = {key: val for key, val in example.items() if key != 'logging'}
+        variants.append(config)
+    return variants
+
+def read_logs(configs: list) -> list:
+    logs = []
+    for config in configs:
+        if 'logging' in config:
+            fileDesc = open(config['logging']['output_file_name'], 'r')
+            logs.append(fileDesc.read())
+            fileDesc.close()
+    return logs
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('-n', '--count', type=int, default=500, help='the number of simulations')
+    parser.add_argument('-w', '--max-workers', type=int, default=64)
+    parser.add_argument('-r', '--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    with TemporaryDirectory(prefix='simulation_') as folder:
+        configs = generate_variants(folder, args.count)
+        expected_outputs = [dumps(run_simulation(config)) for config in configs]
+        expected_logs = read_logs(configs)
+
+        # new threads start from the default context, which is made imprecise, so that any computation outside of a local context fails
+        DefaultContext.prec = 12
+        DefaultContext.rounding = ROUND_UP
+
+        for round in range(args.rounds):
+            outputs = [dumps(output) for output in run_simulations_concurrent(configs, args.max_workers)]
+            mismatches = [n for n in range(len(configs)) if outputs[n] != expected_outputs[n]]
+            assert not mismatches, f'the concurrent output differs from the serial output of simulations {mismatches}'
+            assert read_logs(configs) == expected_logs, 'a concurrent log differs from the serial log'
+            print(f'round {round}: {len(configs)} simulations on {args.max_workers} threads match the serial runs')
@@ -0,0 +1,25 @@
+from sys import stdin, stdout, stderr
+from json import dumps
+from argparse import ArgumentParser
+from core.sweep import run_sweep
+
+parser = ArgumentParser()
+parser.add_argument('-i', '--manifest-file-name', default='-', help='one configuration or request per line, read from stdin if `-`')
+parser.add_argument('-o', '--output-file-name', default='-', help='one reply per line in completion order, written to stdout if `-`')
+parser.add_argument('-w', '--max-workers', type=int, default=None, help='the number of worker processes, by default the number of cores')
+parser.add_argument('-t', '--timeout', type=float, default=None, help='the number of seconds after which a simulation fails')
+parser.add_argument('-n', '--chunk-size', type=int, default=1, help='the number of simulations submitted to a worker at a time')
+parser.add_argument('-q', '--queue-depth', type=int, default=2, help='the number of chunks in flight per worker')
+
+args = parser.parse_args()
+
+input_file = stdin if args.manifest_file_name == '-' else open(args.manifest_file_name, 'r')
+output_file = stdout if args.output_file_name == '-' else open(args.output_file_name, 'w')
+summary = run_sweep(input_file, output_file, args.max_workers, args.timeout, args.chunk_size, args.queue_depth)
+if input_file is not stdin:
+    input_file.close()
+if output_file is not stdout:
+    output_file.close()
+
+stderr.write(dumps(summary, indent=4) + '\n')
+exit(1 if summary['failed'] or summary['timed_out'] else 0)
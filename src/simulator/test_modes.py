@@ -0,0 +1,238 @@
+from os import path, listdir
+from json import loads, dumps
+from time import sleep
+from threading import Event, Thread
+from tempfile import TemporaryDirectory
+from decimal import localcontext
+from core import OPTIONS, BOUNDS, run_simulation, simulate, decToStr, create_context, execute, execute_events, strToDec
+from core.sparse import execute_sparse, expand
+from core import batch, cache, fixed_engine
+from core.columnar import COLUMNS, run_simulation_columnar, encode, decode
+from core.profiler import Profiler, FakeProfiler, create_profiler
+from core.rolling import run_rolling
+from core.float_engine import formatFloat as format_float
+from core.checkpoint import start, resume, append_output
+from core.stream import run_simulation_iter, collect_records
+
+# a strategy whose price leaves its range at both ends and stays beyond it for several steps, so that both orders are drained
+config = {
+    'portfolio_cash_value': '1000',
+    'portfolio_risk_value': '10',
+    'low_range_low_price': '90',
+    'low_range_high_price': '99',
+    'low_range_start_price': '99',
+    'high_range_low_price': '101',
+    'high_range_high_price': '110',
+    'high_range_start_price': '101',
+    'network_fee': '0.002',
+    'prices': ['100', '105', '120', '121', '122', '123', '124', '100', '80', '79', '78', '77', '100']
+}
+
+def load_example() -> dict:
+    fileDesc = open(path.join(path.dirname(path.abspath(__file__)), 'example_config.json'), 'r')
+    example = loads(fileDesc.read())
+    fileDesc.close()
+    return {key: val for key, val in example.items() if key not in OPTIONS}
+
+def count_fills(output: dict) -> int:
+    balances = list(zip(output['CASH']['balance'], output['RISK']['balance']))
+    initial = (config['portfolio_cash_value'], config['portfolio_risk_value'])
+    return sum(1 for before, after in zip([initial] + balances, balances) if before != after)
+
+def test_summary_counts_fills_only():
+    dense = run_simulation(config)
+    summary = run_simulation({**config, 'recording': 'summary_only'})
+    assert count_fills(dense) == 3
+    assert summary['trades'] == count_fills(dense), summary['trades']
+
+def test_sparse_records_fills_only():
+    sparse = run_simulation({**config, 'recording': 'sparse'})
+    assert sparse['trades']['step'] == [1, 2, 8], sparse['trades']['step']
+    config_carbon = strToDec(config)
+    assert expand(execute_sparse(config_carbon), config_carbon['prices']) == execute_events(config_carbon)
+
+def test_batch_validates_all_configs_first():
+    # the second strategy is invalid, so the batch must fail before the first one is executed
+    configs = [{key: val for key, val in config.items() if key != 'prices'}] * 2
+    configs[1] = {**configs[1], 'low_range_start_price': '89'}
+    executed = []
+    execute_steps, execute_fixed = batch.execute_steps, fixed_engine.execute
+    batch.execute_steps = lambda *args, **kwargs: executed.append('decimal') or execute_steps(*args, **kwargs)
+    fixed_engine.execute = lambda *args, **kwargs: executed.append('fixed') or execute_fixed(*args, **kwargs)
+    try:
+        for engine in ['decimal', 'fixed', 'float']:
+            try:
+                batch.run_simulations(config['prices'], configs, engine)
+            except AssertionError as error:
+                assert str(error) == 'invalid configuration', error
+            else:
+                assert False, f'the {engine} batch accepted an invalid configuration'
+    finally:
+        batch.execute_steps, fixed_engine.execute = execute_steps, execute_fixed
+    assert executed == [], executed
+
+def test_columnar_rejects_values_beyond_int64():
+    # a balance of 20 billion exceeds a 64-bit integer at 9 decimals, but fits at 3
+    large = {**config, 'portfolio_cash_value': '20000000000'}
+    try:
+        run_simulation_columnar(large, 'i8', 9)
+    except AssertionError as error:
+        assert str(error).startswith('CASH.balance at step 0 is 20000000000,'), error
+    else:
+        assert False, 'a value beyond int64 was encoded'
+    assert decode(run_simulation_columnar(large, 'i8', 3))['CASH']['balance'][0] == 20000000000000
+
+def test_profiling_accepts_booleans():
+    assert type(create_profiler({'profiling': True})) is Profiler
+    assert type(create_profiler({'profiling': False})) is FakeProfiler
+    assert create_profiler({'profiling': {'output_file_name': 'profile.log'}}).output_file_name == 'profile.log'
+
+def test_profiler_counts_fills_only():
+    for recording in ['dense', 'sparse', 'summary_only']:
+        profiler = Profiler('-')
+        run_simulation({**config, 'recording': recording}, profiler)
+        assert profiler.counters['trades'] == 3, (recording, profiler.counters)
+
+def test_rolling_counts_fills_only():
+    # a start at step 3 drains the high range at once, after which the price stays beyond it until the low range trades at step 8
+    for engine in ['decimal', 'float']:
+        summaries = run_rolling({**config, 'engine': engine}, [0, 3])
+        assert [summary['trades'] for summary in summaries] == [3, 2], (engine, summaries)
+
+def test_rolling_matches_separate_runs():
+    starts = list(range(len(config['prices'])))
+    for start, summary in zip(starts, run_rolling({**config, 'engine': 'decimal'}, starts)):
+        output = run_simulation({**config, 'prices': config['prices'][start:]})
+        assert summary['trades'] == run_simulation({**config, 'prices': config['prices'][start:], 'recording': 'summary_only'})['trades'], start
+        assert [summary[name]['balance'] for name in ['CASH', 'RISK']] == [output[name]['balance'][-1] for name in ['CASH', 'RISK']], start
+        assert [summary[name]['fee'] for name in ['CASH', 'RISK']] == [output[name]['fee'][-1] for name in ['CASH', 'RISK']], start
+        assert summary['portfolio_over_hodl'] == output['portfolio_over_hodl'][-1], start
+
+def test_events_match_steps():
+    for config_carbon in [config, load_example()]:
+        with localcontext(create_context()):
+            assert execute_events(strToDec(config_carbon)) == execute(strToDec(config_carbon), {})
+
+def test_resume_matches_full_run():
+    for config_carbon in [config, load_example()]:
+        prices = config_carbon['prices']
+        # the prices are split at every third of the series, so that the simulation resumes twice
+        output, checkpoint = start({**config_carbon, 'prices': prices[:len(prices) // 3]})
+        for first, last in [(len(prices) // 3, 2 * len(prices) // 3), (2 * len(prices) // 3, len(prices))]:
+            new_output, checkpoint = resume(checkpoint, prices[first:last])
+            output = append_output(output, new_output)
+        assert checkpoint['steps'] == len(prices)
+        assert output == run_simulation(config_carbon)
+
+def test_cache_evicts_least_recently_used():
+    configs = [{**config, 'network_fee': fee} for fee in ['0.001', '0.002', '0.003']]
+    sizes = [len(dumps(run_simulation(config_fee))) for config_fee in configs]
+    # the cache holds two outputs, but not three
+    simulation_cache = cache.SimulationCache(2 * max(sizes))
+    assert 3 * min(sizes) > 2 * max(sizes)
+    for config_fee in [configs[0], configs[1], configs[0], configs[2]]:
+        assert simulation_cache.run_simulation(config_fee) == run_simulation(config_fee)
+    # the second output was used least recently, so it was evicted for the third one
+    assert list(simulation_cache.entries) == [cache.calculate_key(configs[0]), cache.calculate_key(configs[2])]
+    stats = simulation_cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 3, 1), stats
+    # numerically equal values share an entry
+    assert simulation_cache.run_simulation({**configs[2], 'network_fee': '0.0030'}) == run_simulation(configs[2])
+    assert simulation_cache.stats()['hits'] == 2
+
+def test_cache_runs_concurrent_identical_requests_once():
+    started, release = Event(), Event()
+    calls = []
+    run_simulation_cached = cache.run_simulation
+
+    def run_blocked(config: dict, profiler: any = None) -> dict:
+        calls.append(config)
+        started.set()
+        release.wait()
+        return run_simulation_cached(config, profiler)
+
+    simulation_cache = cache.SimulationCache(1 << 20)
+    outputs = []
+    cache.run_simulation = run_blocked
+    try:
+        threads = [Thread(target=lambda: outputs.append(simulation_cache.run_simulation(config))) for _ in range(2)]
+        threads[0].start()
+        started.wait()
+        threads[1].start()
+        # the second request waits for the simulation of the first one rather than running its own
+        while simulation_cache.stats()['waits'] == 0:
+            sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        cache.run_simulation = run_simulation_cached
+    assert len(calls) == 1
+    assert outputs == [run_simulation(config)] * 2
+
+def test_cache_serves_outputs_from_disk():
+    with TemporaryDirectory() as directory:
+        assert cache.SimulationCache(1 << 20, directory).run_simulation(config) == run_simulation(config)
+        assert listdir(directory) == [cache.calculate_key(config) + '.json']
+        # another cache over the same directory, e.g. that of a restarted worker, finds the output on disk
+        simulation_cache = cache.SimulationCache(1 << 20, directory)
+        assert simulation_cache.run_simulation(config) == run_simulation(config)
+        stats = simulation_cache.stats()
+        assert (stats['disk_hits'], stats['misses'], stats['entries']) == (1, 0, 1), stats
+
+def test_stream_matches_run():
+    for config_carbon in [config, load_example()]:
+        assert collect_records(run_simulation_iter(config_carbon)) == run_simulation(config_carbon)
+    for option in [{'engine': 'float'}, {'engine': 'fixed'}, {'recording': 'sparse'}, {'recording': 'summary_only'}]:
+        try:
+            next(run_simulation_iter({**config, **option}))
+        except AssertionError:
+            pass
+        else:
+            assert False, f'{option} was streamed as a dense decimal simulation'
+
+def test_columnar_round_trips():
+    for engine in ['decimal', 'float']:
+        recorder = simulate({**load_example(), 'engine': engine})
+        for dtype, decimals in [('f8', 9), ('i8', 9), ('i8', 0)]:
+            output = decode(encode(recorder, dtype, decimals))
+            assert (output['dtype'], output['decimals']) == (dtype, decimals)
+            assert {key: output[key] for key in BOUNDS} == {key: decToStr(recorder[key]) if engine == 'decimal' else format_float(recorder[key]) for key in BOUNDS}
+            for column in COLUMNS:
+                values = recorder[column[0]][column[1]] if len(column) == 2 else recorder[column[0]]
+                decoded = output[column[0]][column[1]] if len(column) == 2 else output[column[0]]
+                assert len(decoded) == len(values), column
+                if dtype == 'f8':
+                    assert decoded.tolist() == [float(value) for value in values], column
+                else:
+                    # every value is rounded to the given number of decimals
+                    assert all(abs(integer - float(value) * 10 ** decimals) <= 0.5 + abs(float(value)) * 10 ** decimals * 1e-15 for integer, value in zip(decoded.tolist(), values)), column
+
+def test_precision_can_only_be_raised():
+    output = run_simulation(config)
+    assert run_simulation({**config, 'precision': '120'}) == output
+    try:
+        run_simulation({**config, 'precision': '99'})
+    except AssertionError as error:
+        assert str(error) == 'precision 99 is not proven to reproduce the output', error
+    else:
+        assert False, 'a precision below the minimum was accepted'
+
+def test_fixed_outputs_agree():
+    # the fixed engine records integers, which a run, a batch and the columnar output convert each in their own way
+    example = load_example()
+    output = run_simulation({**example, 'engine': 'fixed'})
+    configs = [{key: val for key, val in config_carbon.items() if key != 'prices'} for config_carbon in [example, {**example, 'network_fee': '0'}]]
+    assert batch.run_simulations(example['prices'], configs, 'fixed') == [run_simulation({**config_carbon, 'prices': example['prices'], 'engine': 'fixed'}) for config_carbon in configs]
+    columns = decode(run_simulation_columnar({**example, 'engine': 'fixed'}, 'f8'))
+    for column in COLUMNS:
+        values = output[column[0]][column[1]] if len(column) == 2 else output[column[0]]
+        decoded = columns[column[0]][column[1]] if len(column) == 2 else columns[column[0]]
+        assert decoded.tolist() == [float(value) for value in values], column
+    assert {key: columns[key] for key in BOUNDS} == {key: output[key] for key in BOUNDS}
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f'{name}: passed')
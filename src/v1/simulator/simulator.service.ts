@@ -1,8 +1,9 @@
-import { Injectable } from '@nestjs/common';
+import { Injectable, OnModuleDestroy } from '@nestjs/common';
 import { SimulatorDto } from './simulator.dto';
-import { promises as fsPromises } from 'fs';
+import * as os from 'os';
 import * as path from 'path';
 import * as childProcess from 'child_process';
+import * as readline from 'readline';
 import Decimal from 'decimal.js';
 import moment from 'moment';
 import { toTimestamp } from '../../utilities';
@@ -11,8 +12,25 @@ import { TradingFeePpmUpdatedEventService } from '../../events/trading-fee-ppm-u
 import { HistoricQuoteService } from '../../historic-quote/historic-quote.service';
 import { Deployment } from '../../deployment/deployment.service';
 
+type PendingSimulation = {
+  resolve: (output: any) => void;
+  reject: (error: Error) => void;
+};
+
+type SimulatorWorker = {
+  process: childProcess.ChildProcessWithoutNullStreams;
+  pendingSimulations: Map<number, PendingSimulation>;
+};
+
+// The number of long-lived Python workers, each of which runs one simulation at a time
+const DEFAULT_POOL_SIZE = Math.max(1, Math.min(os.cpus().length, 4));
+
 @Injectable()
-export class SimulatorService {
+export class SimulatorService implements OnModuleDestroy {
+  private workers: SimulatorWorker[] = [];
+  private poolSize = Number(process.env.SIMULATOR_WORKERS) || DEFAULT_POOL_SIZE;
+  private nextRequestId = 0;
+
   constructor(
     private readonly tradingFeePpmUpdatedEventService: TradingFeePpmUpdatedEventService,
     private readonly pairTradingFeePpmUpdatedEventService: PairTradingFeePpmUpdatedEventService,
@@ -71,13 +89,6 @@ export class SimulatorService {
       new Decimal(p.close).div(trimmedPricesQuoteToken[i].close).toString(),
     );
 
-    // Step 1: Create input.json
-    const timestamp = Date.now();
-    const folderPath = path.join(__dirname, `../../simulator/simulation_${timestamp}`);
-    const inputFilePath = path.join(folderPath, 'input.json');
-    const outputPath = path.join(folderPath, 'output.json');
-    // const logPath = path.join(folderPath, 'output.log');
-
     // create inputData object
     const inputData = {
       portfolio_cash_value: buyBudget.toString(),
@@ -91,41 +102,10 @@ export class SimulatorService {
       network_fee: `${feePpm / 1000000}`,
       prices: pricesRatios,
     };
-    // Create folder if it doesn't exist
-    await fsPromises.mkdir(folderPath, { recursive: true });
-
-    // Write input data to input.json
-    await fsPromises.writeFile(inputFilePath, JSON.stringify(inputData, null, 2));
-
-    // Step 2: Run Python executable
-    const pythonExecutablePath = path.join(__dirname, '../../simulator/run.py');
-
-    // Run Python executable asynchronously
-    const pythonProcess = childProcess.spawn('python3', [pythonExecutablePath, '-c', inputFilePath, '-o', outputPath]);
-
-    pythonProcess.stderr.on('data', (data) => {
-      console.error(`Error from Python process: ${data.toString()}`);
-    });
 
     try {
-      // Return a promise that resolves with the content of the output.json file
-      await new Promise<void>((resolve, reject) => {
-        // Handle process exit
-        pythonProcess.on('close', (code) => {
-          if (code !== 0) {
-            console.error(`Python process exited with code ${code}`);
-            reject(new Error(`Python process exited with code ${code}`));
-            return;
-          }
-
-          resolve();
-        });
-      });
-
-      // Read the content of the output.json file
-      const outputData = await fsPromises.readFile(outputPath, 'utf-8');
-
-      const parsedOutput = JSON.parse(outputData);
+      // Run the simulation on a long-lived Python worker of the pool
+      const parsedOutput = await this.runOnWorker(inputData);
       // Add the 'dates' array to the result
       parsedOutput.dates = dates.map((d) => toTimestamp(new Date(d)));
 
@@ -135,4 +115,112 @@ export class SimulatorService {
       throw err;
     }
   }
+
+  onModuleDestroy(): void {
+    const workers = this.workers;
+    this.workers = [];
+    for (const worker of workers) {
+      worker.process.kill();
+    }
+  }
+
+  private runOnWorker(config: any): Promise<any> {
+    const worker = this.getWorker();
+    const id = this.nextRequestId++;
+
+    return new Promise<any>((resolve, reject) => {
+      worker.pendingSimulations.set(id, { resolve, reject });
+      worker.process.stdin.write(`${JSON.stringify({ id, config })}\n`);
+    });
+  }
+
+  private getWorker(): SimulatorWorker {
+    // Prefer an idle worker, spawn another one while the pool is not full, and otherwise queue on the least busy one
+    let leastBusy: SimulatorWorker | null = null;
+    for (const worker of this.workers) {
+      if (!leastBusy || worker.pendingSimulations.size < leastBusy.pendingSimulations.size) {
+        leastBusy = worker;
+      }
+    }
+    if (leastBusy && (leastBusy.pendingSimulations.size === 0 || this.workers.length >= this.poolSize)) {
+      return leastBusy;
+    }
+
+    const worker = this.spawnWorker();
+    this.workers.push(worker);
+    return worker;
+  }
+
+  private spawnWorker(): SimulatorWorker {
+    const pythonExecutablePath = path.join(__dirname, '../../simulator/run.py');
+    const worker: SimulatorWorker = {
+      process: childProcess.spawn('python3', [pythonExecutablePath, '--serve']),
+      pendingSimulations: new Map<number, PendingSimulation>(),
+    };
+
+    // Profiles, enabled by SIMULATOR_PROFILE=- in the environment, arrive on stderr as single json lines
+    readline.createInterface({ input: worker.process.stderr }).on('line', (line) => {
+      if (line.startsWith('{"profile"')) {
+        console.log(`Simulation profile: ${line}`);
+      } else {
+        console.error(`Error from Python process: ${line}`);
+      }
+    });
+
+    readline.createInterface({ input: worker.process.stdout }).on('line', (line) => {
+      let reply;
+      try {
+        reply = JSON.parse(line);
+      } catch (err) {
+        // The worker replies in the order of the requests, so a malformed reply belongs to the oldest one in flight
+        const oldest = worker.pendingSimulations.keys().next();
+        if (!oldest.done) {
+          const pending = worker.pendingSimulations.get(oldest.value);
+          worker.pendingSimulations.delete(oldest.value);
+          pending.reject(new Error(`Malformed reply from Python process: ${err.message}`));
+        }
+        return;
+      }
+
+      const pending = worker.pendingSimulations.get(reply.id);
+      if (!pending) {
+        return;
+      }
+
+      worker.pendingSimulations.delete(reply.id);
+      if (reply.error) {
+        pending.reject(new Error(`Simulation failed: ${reply.error}`));
+      } else {
+        pending.resolve(reply.output);
+      }
+    });
+
+    // Fail every in-flight simulation of a worker which fails to spawn, exits or cannot be written to,
+    // and spawn another one on a later request
+    worker.process.on('error', (err) => {
+      this.failWorker(worker, `Error in Python process: ${err.message}`);
+    });
+    worker.process.stdin.on('error', (err) => {
+      this.failWorker(worker, `Error writing to Python process: ${err.message}`);
+    });
+    worker.process.on('exit', (code, signal) => {
+      this.failWorker(worker, `Python process exited with code ${code ?? signal}`);
+    });
+
+    return worker;
+  }
+
+  private failWorker(worker: SimulatorWorker, message: string): void {
+    console.error(message);
+    const index = this.workers.indexOf(worker);
+    if (index !== -1) {
+      this.workers.splice(index, 1);
+      worker.process.kill();
+    }
+
+    for (const pending of worker.pendingSimulations.values()) {
+      pending.reject(new Error(message));
+    }
+    worker.pendingSimulations.clear();
+  }
 }